@@ -0,0 +1,49 @@
+import argparse
+import sys
+from pathlib import Path
+
+from shards import run_sharded_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS  # noqa: E402
+
+# --- CONFIGURATION ---
+DATA_OUTPUT_FILE = "basex_result1.txt"
+REFS_OUTPUT_FILE = "basex_result2.txt"
+
+def export_basex_all(compression=None):
+    print("Streaming Result 1 and Result 2 from BaseX in a single pass...")
+
+    # One scan of the documents: each one returns its Result 1 line, then its
+    # Result 2 line or "" when it cites nothing
+    query_string = """
+    for $article in db:open('{db}')//document
+    let $pmid := $article//infon[@key='article-id_pmid']/text()
+    where exists($pmid)
+    let $title := $article//passage[infon[@key='section_type']='TITLE']/text/text()
+    let $abstract_parts := $article//passage[infon[@key='section_type']='ABSTRACT']/text/text()
+    let $ref_ids := $article//passage[infon[@key='section_type'] = 'REF']//infon[@key='pub-id_pmid']/text()
+    return (
+      concat($pmid[1], "/", string-join($title, " "), " ", string-join($abstract_parts, " ")),
+      if (exists($ref_ids)) then concat($pmid[1], "/", string-join($ref_ids, "/")) else ""
+    )
+    """
+
+    try:
+        # Clean up any newlines within the text to keep one article per line
+        data_count, refs_count = run_sharded_split(
+            query_string, [DATA_OUTPUT_FILE, REFS_OUTPUT_FILE],
+            cleaners=[lambda item: " ".join(item.splitlines()), None], compression=compression)
+        print(f"SUCCESS: Exported {data_count} lines to {DATA_OUTPUT_FILE} "
+              f"and {refs_count} lines to {REFS_OUTPUT_FILE}.")
+
+    except Exception as e:
+        print(f"CRITICAL ERROR: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Result 1 and Result 2 from BaseX in one pass.")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write both outputs compressed in parallel blocks")
+    args = parser.parse_args()
+    export_basex_all(args.compress)
@@ -1,15 +1,22 @@
-from BaseXClient import BaseXClient
+import argparse
+import sys
+from pathlib import Path
+
+from shards import run_sharded_query
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS  # noqa: E402
 
 # --- CONFIGURATION ---
-SESSION = BaseXClient.Session('localhost', 1984, 'admin', 'admin')
 OUTPUT_FILE = "basex_result1.txt"
 
-def export_basex_data():
+def export_basex_data(compression=None, incremental=False):
     print("Streaming Title and Abstract data from BaseX...")
     
     # FIXED XQUERY: Using [1] to handle sequences and string-join for safety
     query_string = """
-    for $article in db:open('litcovid_xml')//document
+    for $article in db:open('{db}')//document
     let $pmid := $article//infon[@key='article-id_pmid']/text()
     let $title := $article//passage[infon[@key='section_type']='TITLE']/text/text()
     let $abstract_parts := $article//passage[infon[@key='section_type']='ABSTRACT']/text/text()
@@ -19,29 +26,21 @@ def export_basex_data():
     """
     
     try:
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            query = SESSION.query(query_string)
-            count = 0
-            
-            # Using the .iter() protocol to stream (typecode, item)
-            for typecode, item in query.iter():
-                if item:
-                    # Clean up any newlines within the text to keep one article per line
-                    cleaned_item = " ".join(item.splitlines())
-                    f.write(cleaned_item + "\n")
-                    count += 1
-                
-                if count % 5000 == 0 and count > 0:
-                    print(f"Exported {count} articles...")
-            
-            query.close()
-            
+        # Every shard is queried over its own session; the parts are merged in shard order.
+        # Clean up any newlines within the text to keep one article per line
+        count = run_sharded_query(query_string, OUTPUT_FILE,
+                                  clean=lambda item: " ".join(item.splitlines()),
+                                  compression=compression, incremental=incremental)
         print(f"SUCCESS: Exported {count} lines to {OUTPUT_FILE}.")
         
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")
-    finally:
-        SESSION.close()
 
 if __name__ == "__main__":
-    export_basex_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 1 from BaseX.")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the shards added since the last incremental export")
+    args = parser.parse_args()
+    export_basex_data(args.compress, args.incremental)
\ No newline at end of file
@@ -1,16 +1,23 @@
-from BaseXClient import BaseXClient
+import argparse
+import sys
+from pathlib import Path
+
+from shards import run_sharded_query
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS  # noqa: E402
 
 # --- CONFIGURATION ---
-SESSION = BaseXClient.Session('localhost', 1984, 'admin', 'admin')
 OUTPUT_FILE = "basex_result2.txt"
 
-def export_basex_refs():
+def export_basex_refs(compression=None, incremental=False):
     print("Streaming citations from BaseX using the corrected XML paths...")
     
     # We use your logic: 'infon' (singular), 'article-id_pmid', and 'REF' section_type.
-    # We iterate over the single database 'litcovid_xml'.
+    # {db} is each shard written by load_to_basex.py, or the single database 'litcovid_xml'.
     query_string = """
-    for $article in db:open('litcovid_xml')//document
+    for $article in db:open('{db}')//document
     let $source_id := $article//infon[@key = 'article-id_pmid']/text()
     let $ref_ids := $article//passage[infon[@key='section_type'] = 'REF']//infon[@key='pub-id_pmid']/text()
     where exists($source_id) and exists($ref_ids)
@@ -18,27 +25,18 @@ def export_basex_refs():
     """
     
     try:
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            query = SESSION.query(query_string)
-            count = 0
-            
-            # Using .iter() to stream (typecode, item) pairs from the server
-            for typecode, item in query.iter():
-                if item:
-                    f.write(item + "\n")
-                    count += 1
-                
-                if count % 5000 == 0 and count > 0:
-                    print(f"Exported {count} citation rows...")
-            
-            query.close()
-            
+        # Every shard is queried over its own session; the parts are merged in shard order
+        count = run_sharded_query(query_string, OUTPUT_FILE, compression=compression, incremental=incremental)
         print(f"SUCCESS: Exported {count} lines to {OUTPUT_FILE}.")
         
     except Exception as e:
         print(f"CRITICAL ERROR: {e}")
-    finally:
-        SESSION.close()
 
 if __name__ == "__main__":
-    export_basex_refs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 2 from BaseX.")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the shards added since the last incremental export")
+    args = parser.parse_args()
+    export_basex_refs(args.compress, args.incremental)
\ No newline at end of file
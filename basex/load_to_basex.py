@@ -0,0 +1,99 @@
+import argparse
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from shards import SHARD_PREFIX, list_databases, open_session, shard_index, shard_name
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.bioc_xml import SegmentReader, find_document_segments  # noqa: E402
+
+# --- CONFIGURATION ---
+# The BioC XML dump, in the folder mounted as the BaseX data directory (compose.yml)
+FILE_PATH = '../data/basex/litcovid2BioCXML'
+# The same folder as seen by the BaseX server
+SERVER_DATA_DIR = '/srv/basex/data'
+SHARDS = 8
+# Set on every shard before it is created: attribute and text indexes for the
+# infon[@key=...] and section_type comparisons of the exporters, kept up to date
+# on updates, no full-text index, and the faster internal XML parser
+DB_OPTIONS = {
+    "ATTRINDEX": "true",
+    "TEXTINDEX": "true",
+    "UPDINDEX": "true",
+    "FTINDEX": "false",
+    "INTPARSE": "true",
+}
+
+def write_shard_files(path, shards):
+    """Split the dump into standalone XML files of whole documents, next to it."""
+    segment_size = -(-os.path.getsize(path) // shards)
+    shard_files = []
+    for index, (start, end) in enumerate(find_document_segments(path, segment_size)):
+        shard_file = Path(f"{path}.shard-{index:03d}.xml")
+        with SegmentReader(path, start, end) as reader, open(shard_file, 'wb') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8"?>\n')
+            shutil.copyfileobj(reader, f, 1024 * 1024)
+        shard_files.append(shard_file)
+    return shard_files
+
+def create_shard(index, shard_file):
+    # One session per shard: BaseX creates different databases concurrently
+    session = open_session()
+    try:
+        start_time = time.perf_counter()
+        for option, value in DB_OPTIONS.items():
+            session.execute(f"SET {option} {value}")
+        server_path = f"{SERVER_DATA_DIR}/{shard_file.name}"
+        session.execute(f"CREATE DB {shard_name(index)} {server_path}")
+        print(f"{shard_name(index)} created in {time.perf_counter() - start_time:.2f} seconds.")
+    finally:
+        session.close()
+
+def load_to_basex(path=FILE_PATH, shards=SHARDS, keep_shard_files=False, append=False):
+    """
+    Split `path` into `shards` databases. The existing shards are dropped, or
+    kept with append=True: the new ones are then numbered after them, for
+    the incremental exports.
+    """
+    start_time = time.perf_counter()
+    print(f"Splitting {path} into {shards} shards...")
+    shard_files = write_shard_files(path, shards)
+
+    session = open_session()
+    try:
+        if append:
+            existing = [name for name in list_databases(session) if name.startswith(SHARD_PREFIX)]
+            first = shard_index(existing[-1]) + 1 if existing else 0
+        else:
+            session.execute(f"DROP DB {SHARD_PREFIX}*")
+            first = 0
+    finally:
+        session.close()
+
+    try:
+        print(f"Creating {len(shard_files)} databases from {shard_name(first)}...")
+        with ThreadPoolExecutor(max_workers=len(shard_files)) as pool:
+            list(pool.map(create_shard, range(first, first + len(shard_files)), shard_files))
+    finally:
+        if not keep_shard_files:
+            for shard_file in shard_files:
+                shard_file.unlink(missing_ok=True)
+
+    print(f"DONE in {time.perf_counter() - start_time:.2f} seconds.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load the BioC XML dump into sharded BaseX databases.")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--shards", type=int, default=SHARDS)
+    parser.add_argument("--keep-shard-files", action="store_true",
+                        help="keep the split XML files after the databases are created")
+    parser.add_argument("--append", action="store_true",
+                        help="add the file as new shards instead of replacing the existing ones")
+    args = parser.parse_args()
+
+    load_to_basex(args.file_path, args.shards, args.keep_shard_files, args.append)
@@ -0,0 +1,156 @@
+"""
+Sharded BaseX databases.
+load_to_basex.py splits the BioC dump into litcovid_xml_000, litcovid_xml_001, ...
+in document order; the exporters run their query on every shard concurrently,
+one session per shard, and concatenate the results in shard order.
+Without shards, the single litcovid_xml database of load_to_basex.sh is used.
+Shards added by load_to_basex.py --append get the next numbers, so an
+incremental export only queries the shards past the last one it exported
+(its watermark) and appends their lines; after a full reload the shards are
+renumbered from 000 and the next export must be a full one.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from BaseXClient import BaseXClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output, output_path  # noqa: E402
+from common.watermark import load_watermark, save_watermark  # noqa: E402
+
+# --- CONFIGURATION ---
+HOST = 'localhost'
+PORT = 1984
+USER = 'admin'
+PASSWORD = 'admin'
+DB_NAME = 'litcovid_xml'
+SHARD_PREFIX = DB_NAME + '_'
+
+
+def open_session():
+    return BaseXClient.Session(HOST, PORT, USER, PASSWORD)
+
+
+def shard_name(index):
+    return f"{SHARD_PREFIX}{index:03d}"
+
+
+def shard_index(name):
+    return int(name[len(SHARD_PREFIX):])
+
+
+def list_databases(session):
+    """Return the shard names in document order, or [DB_NAME] when there are none."""
+    query = session.query(f"db:list()[starts-with(., '{SHARD_PREFIX}')]")
+    names = sorted(item for _, item in query.iter())
+    query.close()
+    return names or [DB_NAME]
+
+
+def _export_database(query_template, database, part_paths, cleaners):
+    # Items are dealt to the outputs in turn: with two outputs the query
+    # returns two items per document, an empty item meaning "no line"
+    session = open_session()
+    try:
+        counts = [0] * len(part_paths)
+        query = session.query(query_template.replace('{db}', database))
+        files = [open(path, 'w', encoding='utf-8') for path in part_paths]
+        try:
+            for index, (typecode, item) in enumerate(query.iter()):
+                slot = index % len(files)
+                if item:
+                    clean = cleaners[slot]
+                    files[slot].write((clean(item) if clean else item) + "\n")
+                    counts[slot] += 1
+        finally:
+            for f in files:
+                f.close()
+        query.close()
+        print(f"{database}: exported {' + '.join(str(count) for count in counts)} lines.")
+        return counts
+    finally:
+        session.close()
+
+
+def run_sharded_split(query_template, output_files, cleaners=None, workers=None, compression=None,
+                      databases=None, append=False):
+    """
+    Run `query_template` on every database (or on `databases`) and write its
+    items to `output_files` in turn, one per line, each file in database order.
+    `{db}` in the query is replaced by the database name; `cleaners[i]`, when
+    given, is applied to the items of output i; `compression` applies to the
+    merged files, which are appended to with append=True.
+    Return the line count of each file.
+    """
+    if databases is None:
+        session = open_session()
+        try:
+            databases = list_databases(session)
+        finally:
+            session.close()
+
+    cleaners = cleaners or [None] * len(output_files)
+    workers = workers or len(databases)
+    print(f"Querying {len(databases)} database(s) with {workers} session(s)...")
+    start_time = time.perf_counter()
+    output_dir = os.path.dirname(os.path.abspath(output_files[0]))
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir:
+        parts = [[os.path.join(tmp_dir, f"part-{index:05d}-{slot}") for slot in range(len(output_files))]
+                 for index in range(len(databases))]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(lambda args: _export_database(query_template, *args, cleaners),
+                                   zip(databases, parts)))
+
+        for slot, output_file in enumerate(output_files):
+            with open_output(output_file, compression, append=append) as out:
+                for database_parts in parts:
+                    with open(database_parts[slot], 'rb') as f:
+                        shutil.copyfileobj(f, out, 1024 * 1024)
+
+    print(f"Merged {len(parts)} part(s) in {time.perf_counter() - start_time:.2f} seconds.")
+    return [sum(database_counts[slot] for database_counts in counts)
+            for slot in range(len(output_files))]
+
+
+def run_sharded_query(query_template, output_file, clean=None, workers=None, compression=None,
+                      incremental=False):
+    """
+    Run `query_template` on every database and write the items, one per line,
+    to `output_file` in database order. `{db}` in the query is replaced by
+    the database name; `clean` is applied to each item before it is written.
+    With incremental=True only the shards past the watermark are queried.
+    Return the number of lines written.
+    """
+    if incremental:
+        return _run_incremental_query(query_template, output_file, clean, workers, compression)
+    return run_sharded_split(query_template, [output_file], [clean], workers, compression)[0]
+
+
+def _run_incremental_query(query_template, output_file, clean, workers, compression):
+    path = output_path(output_file, compression)
+    after = load_watermark(path)
+    session = open_session()
+    try:
+        databases = list_databases(session)
+    finally:
+        session.close()
+    if databases == [DB_NAME]:
+        raise ValueError(f"Incremental export needs the shards of load_to_basex.py, not {DB_NAME}")
+
+    databases = [name for name in databases if after is None or shard_index(name) > after]
+    if not databases:
+        print(f"Nothing to export: no shards past {shard_name(after)}.")
+        return 0
+    print(f"Exporting shards {databases[0]} to {databases[-1]} "
+          f"({'appending' if after is not None else 'full export'})...")
+    count = run_sharded_split(query_template, [output_file], [clean], workers, compression,
+                              databases, append=after is not None)[0]
+    save_watermark(path, shard_index(databases[-1]))
+    return count
@@ -0,0 +1 @@
+"""Helpers shared by the converter, the loaders and the exporters of every backend."""
@@ -0,0 +1,56 @@
+"""
+Article fields derived from BioC passages, and the Result 1 / Result 2 line formats.
+Result 1 lines are "PMID/Title Abstract", Result 2 lines are "PMID/Ref1/Ref2/...".
+"""
+
+
+def extract_article(doc):
+    """
+    Return the pmid, title, abstract and cited PMIDs of a converted document.
+    The PMID is the first article-id_pmid found, the title the first TITLE
+    passage, the abstract every ABSTRACT passage joined with spaces and
+    ref_pmids the distinct pub-id_pmid values of REF passages, in order.
+    """
+    pmid = None
+    title = None
+    abstract_parts = []
+    ref_pmids = []
+    seen_refs = set()
+
+    for p in doc.get('passages', []):
+        infons = p.get('infons', {})
+        section_type = infons.get('section_type')
+
+        if not pmid:
+            pmid = infons.get('article-id_pmid') or None
+
+        if section_type == 'TITLE':
+            if title is None:
+                title = p.get('text', '')
+        elif section_type == 'ABSTRACT':
+            text = p.get('text')
+            if text:
+                abstract_parts.append(text)
+        elif section_type == 'REF':
+            ref_id = infons.get('pub-id_pmid')
+            if ref_id and ref_id not in seen_refs:
+                seen_refs.add(ref_id)
+                ref_pmids.append(ref_id)
+
+    return {
+        'pmid': pmid,
+        'title': title or '',
+        'abstract': ' '.join(abstract_parts),
+        'ref_pmids': ref_pmids,
+    }
+
+
+def format_data_line(pmid, title, abstract):
+    """Format a Result 1 line, folding newlines so there is one article per line."""
+    line = f"{pmid}/{title or ''} {abstract or ''}"
+    return " ".join(line.splitlines()) + "\n"
+
+
+def format_refs_line(pmid, ref_pmids):
+    """Format a Result 2 line."""
+    return f"{pmid}/{'/'.join(str(r) for r in ref_pmids)}\n"
@@ -0,0 +1,90 @@
+"""
+Asyncio export engine.
+An export runs as three concurrent stages connected by bounded queues:
+- fetch: the backend's async cursor, batched (network)
+- format: the exporter's row -> line function, in a worker thread (CPU)
+- write: the formatted chunks written to the output file in a worker thread (disk)
+While one batch is written the next is formatted and the one after is fetched;
+the queue bounds keep at most a few batches in memory.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from common.output_sink import open_output
+
+BATCH_SIZE = 2000
+QUEUE_SIZE = 8
+
+_DONE = object()
+
+
+def _format_batch(format_row, batch):
+    lines = [line for line in map(format_row, batch) if line is not None]
+    return ''.join(lines), len(lines)
+
+
+async def _fetch_stage(rows, batch_size, queue):
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            await queue.put(batch)
+            batch = []
+    if batch:
+        await queue.put(batch)
+    await queue.put(_DONE)
+
+
+async def _format_stage(format_row, in_queue, out_queue, executor):
+    loop = asyncio.get_running_loop()
+    while (batch := await in_queue.get()) is not _DONE:
+        await out_queue.put(await loop.run_in_executor(executor, _format_batch, format_row, batch))
+    await out_queue.put(_DONE)
+
+
+async def _write_stage(f, queue, executor, progress_every):
+    loop = asyncio.get_running_loop()
+    count = 0
+    next_report = progress_every
+    while (item := await queue.get()) is not _DONE:
+        chunk, lines = item
+        await loop.run_in_executor(executor, f.write, chunk)
+        count += lines
+        if count >= next_report:
+            print(f"Exported {count} lines...")
+            next_report += progress_every
+    return count
+
+
+async def run_export(rows, format_row, output_file, batch_size=BATCH_SIZE,
+                     queue_size=QUEUE_SIZE, progress_every=50000, compression=None):
+    """
+    Export the async iterable `rows` to `output_file`.
+    `format_row` turns a row into an output line (with its newline), or None
+    to skip it. `compression` is passed to open_output().
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    fetched = asyncio.Queue(maxsize=queue_size)
+    formatted = asyncio.Queue(maxsize=queue_size)
+
+    # One thread each, so batches are formatted and written in fetch order
+    with ThreadPoolExecutor(max_workers=1) as format_executor, \
+            ThreadPoolExecutor(max_workers=1) as write_executor, \
+            open_output(output_file, compression) as f:
+        stages = [
+            asyncio.create_task(_fetch_stage(rows, batch_size, fetched)),
+            asyncio.create_task(_format_stage(format_row, fetched, formatted, format_executor)),
+            asyncio.create_task(_write_stage(f, formatted, write_executor, progress_every)),
+        ]
+        try:
+            _, _, count = await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            raise
+
+    print(f"Exported {count} lines to {output_file} in {time.perf_counter() - start_time:.2f} seconds.")
+    return count
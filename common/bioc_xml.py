@@ -0,0 +1,333 @@
+"""
+Streaming access to BioC XML dumps.
+Parses <document> elements into dictionaries and splits a dump into
+byte ranges that each hold whole documents, so they can be parsed in parallel.
+
+Three parser backends produce identical documents:
+- etree: stdlib ElementTree iterparse, builds every element of a document
+- expat: stdlib expat callbacks, keeps only ids, passage infons, offsets and texts
+- lxml: lxml iterparse filtered on <document> (optional dependency)
+"""
+
+import os
+import xml.etree.ElementTree as ET
+from xml.parsers import expat
+
+DOCUMENT_TAG = b'<document>'
+COLLECTION_END_TAG = b'</collection>'
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def parse_infon(infon_elem):
+    """Parse an infon element and return key-value pair."""
+    key = infon_elem.get('key', '')
+    value = infon_elem.text if infon_elem.text else ''
+    return key, value
+
+
+def parse_passage(passage_elem):
+    """Parse a passage element and return a dictionary."""
+    passage = {}
+    infons = {}
+    offset = None
+    text = None
+
+    for child in passage_elem:
+        if child.tag == 'infon':
+            key, value = parse_infon(child)
+            if key:
+                infons[key] = value
+        elif child.tag == 'offset':
+            offset = child.text if child.text else None
+        elif child.tag == 'text':
+            text = child.text if child.text else None
+
+    if infons:
+        passage['infons'] = infons
+    if offset is not None:
+        # Try to convert offset to int, otherwise keep as string
+        try:
+            passage['offset'] = int(offset)
+        except (ValueError, AttributeError):
+            passage['offset'] = offset
+    if text is not None:
+        passage['text'] = text
+
+    return passage
+
+
+def parse_document(doc_elem):
+    """Parse a document element and return a dictionary."""
+    doc = {}
+    doc_id = None
+    passages = []
+
+    for child in doc_elem:
+        if child.tag == 'id':
+            doc_id = child.text if child.text else None
+        elif child.tag == 'passage':
+            passage = parse_passage(child)
+            if passage:
+                passages.append(passage)
+
+    if doc_id:
+        doc['id'] = doc_id
+    if passages:
+        doc['passages'] = passages
+
+    return doc
+
+
+def _iter_documents_etree(source):
+    context = iter(ET.iterparse(source, events=('start', 'end')))
+    event, root = next(context)
+
+    for event, elem in context:
+        if event == 'end' and elem.tag == 'document':
+            doc = parse_document(elem)
+            if doc:
+                yield doc
+            # Drop the finished document from the tree so memory stays flat
+            root.clear()
+
+
+class _ExpatDocumentBuilder:
+    """
+    Expat callbacks that build document dictionaries directly.
+    Only <id> under <document> and <infon>, <offset>, <text> under <passage>
+    are collected; annotations, relations and sentences are skipped.
+    """
+
+    def __init__(self):
+        self.documents = []
+        self._path = []
+        self._buffer = None
+        self._buffer_depth = 0
+        self._infon_key = ''
+        self._doc_id = None
+        self._passages = None
+        self._passage = None
+
+    def start(self, tag, attrs):
+        parent = self._path[-1] if self._path else None
+        self._path.append(tag)
+
+        if tag == 'document':
+            self._doc_id = None
+            self._passages = []
+        elif parent == 'document':
+            if tag == 'passage':
+                self._passage = {'infons': {}, 'offset': None, 'text': None}
+            elif tag == 'id':
+                self._start_buffer()
+        elif parent == 'passage' and self._passage is not None:
+            if tag in ('infon', 'offset', 'text'):
+                self._start_buffer()
+                if tag == 'infon':
+                    self._infon_key = attrs.get('key', '')
+
+    def _start_buffer(self):
+        self._buffer = []
+        self._buffer_depth = len(self._path)
+
+    def data(self, text):
+        # Like Element.text, only keep character data directly inside the element
+        if self._buffer is not None and len(self._path) == self._buffer_depth:
+            self._buffer.append(text)
+
+    def end(self, tag):
+        depth = len(self._path)
+        self._path.pop()
+        parent = self._path[-1] if self._path else None
+
+        if self._buffer is not None:
+            if depth != self._buffer_depth:
+                return
+            value = ''.join(self._buffer)
+            self._buffer = None
+            if parent == 'document':
+                self._doc_id = value or None
+            elif tag == 'infon':
+                if self._infon_key:
+                    self._passage['infons'][self._infon_key] = value
+            else:
+                self._passage[tag] = value or None
+        elif tag == 'passage' and parent == 'document':
+            passage = self._finish_passage(self._passage)
+            self._passage = None
+            if passage:
+                self._passages.append(passage)
+        elif tag == 'document':
+            doc = {}
+            if self._doc_id:
+                doc['id'] = self._doc_id
+            if self._passages:
+                doc['passages'] = self._passages
+            self._passages = None
+            if doc:
+                self.documents.append(doc)
+
+    @staticmethod
+    def _finish_passage(fields):
+        """Drop empty fields the same way parse_passage() does."""
+        passage = {}
+        if fields['infons']:
+            passage['infons'] = fields['infons']
+        offset = fields['offset']
+        if offset is not None:
+            try:
+                passage['offset'] = int(offset)
+            except ValueError:
+                passage['offset'] = offset
+        if fields['text'] is not None:
+            passage['text'] = fields['text']
+        return passage
+
+
+def _iter_documents_expat(source):
+    builder = _ExpatDocumentBuilder()
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    parser.StartElementHandler = builder.start
+    parser.EndElementHandler = builder.end
+    parser.CharacterDataHandler = builder.data
+
+    f = open(source, 'rb') if isinstance(source, (str, os.PathLike)) else source
+    try:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            parser.Parse(chunk, not chunk)
+            yield from builder.documents
+            builder.documents.clear()
+            if not chunk:
+                break
+    except expat.ExpatError as e:
+        raise ET.ParseError(str(e)) from e
+    finally:
+        if f is not source:
+            f.close()
+
+
+def _iter_documents_lxml(source):
+    from lxml import etree  # Install with: pip install lxml
+
+    if isinstance(source, os.PathLike):
+        source = os.fspath(source)
+    context = etree.iterparse(source, events=('end',), tag='document', huge_tree=True)
+    try:
+        for event, elem in context:
+            doc = parse_document(elem)
+            if doc:
+                yield doc
+            # Free the document and the already processed siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        raise ET.ParseError(str(e)) from e
+
+
+PARSER_BACKENDS = {
+    'etree': _iter_documents_etree,
+    'expat': _iter_documents_expat,
+    'lxml': _iter_documents_lxml,
+}
+
+
+def iter_documents(source, backend='etree'):
+    """
+    Yield every non-empty document of a BioC collection as a dictionary.
+    `source` is a path or a binary file object, `backend` a PARSER_BACKENDS key.
+    """
+    return PARSER_BACKENDS[backend](source)
+
+
+def _find_tag(f, position, tag, limit):
+    """Return the offset of the first `tag` at or after `position`, or `limit` if none."""
+    f.seek(position)
+    carry = b''
+    base = position
+    while base < limit:
+        chunk = f.read(min(READ_CHUNK_SIZE, limit - base))
+        if not chunk:
+            break
+        data = carry + chunk
+        found = data.find(tag)
+        if found != -1:
+            return min(base - len(carry) + found, limit)
+        # Keep the tail in case the tag straddles two chunks
+        carry = data[-(len(tag) - 1):]
+        base += len(chunk)
+    return limit
+
+
+def _collection_end(f, size):
+    """Return the offset of the closing </collection> tag."""
+    tail_start = max(0, size - READ_CHUNK_SIZE)
+    f.seek(tail_start)
+    found = f.read().rfind(COLLECTION_END_TAG)
+    return tail_start + found if found != -1 else size
+
+
+def find_document_segments(path, segment_size, offset=0):
+    """
+    Split a BioC dump into (start, end) byte ranges of roughly `segment_size` bytes.
+    Every range starts on a <document> tag and contains only whole documents.
+    Documents starting before `offset` are skipped.
+    """
+    size = os.path.getsize(path)
+    segments = []
+
+    with open(path, 'rb') as f:
+        end_of_documents = _collection_end(f, size)
+        start = _find_tag(f, offset, DOCUMENT_TAG, end_of_documents)
+
+        while start < end_of_documents:
+            target = start + max(segment_size, len(DOCUMENT_TAG))
+            end = _find_tag(f, target, DOCUMENT_TAG, end_of_documents)
+            segments.append((start, end))
+            start = end
+
+    return segments
+
+
+class SegmentReader:
+    """
+    Read-only binary file object over one segment of a BioC dump.
+    The documents are wrapped in their own <collection> element so the
+    segment parses as a standalone XML document.
+    """
+
+    def __init__(self, path, start, end):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._remaining = end - start
+        self._prefix = b'<collection>'
+        self._suffix = b'</collection>'
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = len(self._prefix) + self._remaining + len(self._suffix)
+
+        data = b''
+        if self._prefix:
+            data, self._prefix = self._prefix[:size], self._prefix[size:]
+        if len(data) < size and self._remaining:
+            chunk = self._file.read(min(size - len(data), self._remaining))
+            self._remaining -= len(chunk)
+            if not chunk:
+                self._remaining = 0
+            data += chunk
+        if len(data) < size and not self._remaining:
+            wanted = size - len(data)
+            data, self._suffix = data + self._suffix[:wanted], self._suffix[wanted:]
+        return data
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,179 @@
+"""
+Backend-native bulk-load formats written by the converter in the same pass:
+- PostgreSQL COPY text for bioc_data(document)
+- MongoDB JSON Lines with pmid/title/abstract/ref_pmids extracted at top level
+- neo4j-admin import CSVs for :Article nodes and :CITES relationships
+"""
+
+import csv
+import io
+from collections import deque
+from pathlib import Path
+
+NEO4J_NODES_FILE = 'articles.csv'
+NEO4J_NODES_HEADER_FILE = 'articles-header.csv'
+NEO4J_EDGES_FILE = 'cites.csv'
+NEO4J_EDGES_HEADER_FILE = 'cites-header.csv'
+NEO4J_NODES_HEADER = ['pmid:ID(Article)', 'title', 'abstract', ':LABEL']
+NEO4J_EDGES_HEADER = [':START_ID(Article)', ':END_ID(Article)', ':TYPE']
+# Starts the relationship rows of every document in the converter's part
+# files, so they can be matched with the document's node row when merged
+NEO4J_DOCUMENT_MARKER = '\n'
+
+
+def pg_copy_line(doc_json):
+    """
+    Escape a compact JSON document as one line of COPY text format.
+    Compact JSON has no raw control characters, so only backslashes need escaping.
+    """
+    return doc_json.replace('\\', '\\\\') + '\n'
+
+
+_COPY_ESCAPES = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r'})
+
+
+def pg_copy_row(*values):
+    """Format one row of COPY text format; None becomes NULL."""
+    return '\t'.join('\\N' if value is None else str(value).translate(_COPY_ESCAPES)
+                     for value in values) + '\n'
+
+
+def mongo_document(doc, article):
+    """Return the document with the derived article fields added at top level."""
+    mongo_doc = dict(doc)
+    mongo_doc.update(article)
+    return mongo_doc
+
+
+def _fold(text):
+    return ' '.join(text.splitlines()) if text else ''
+
+
+def neo4j_rows(article):
+    """Return the node CSV line and the relationship CSV lines of one article."""
+    pmid = article['pmid']
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow([pmid, _fold(article['title']), _fold(article['abstract']), 'Article'])
+    node = buffer.getvalue()
+    edges = ''.join(f"{pmid},{ref_pmid},CITES\n" for ref_pmid in article['ref_pmids'])
+    return node, edges
+
+
+def write_neo4j_headers(directory):
+    """Write the header files neo4j-admin reads before each data file."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, header in ((NEO4J_NODES_HEADER_FILE, NEO4J_NODES_HEADER),
+                         (NEO4J_EDGES_HEADER_FILE, NEO4J_EDGES_HEADER)):
+        with open(directory / name, 'w', encoding='utf-8', newline='') as f:
+            csv.writer(f, lineterminator='\n').writerow(header)
+
+
+class PmidSet:
+    """
+    Compact set of PMIDs.
+    Numeric PMIDs are stored as bits of a bytearray (about 5 MB for the whole
+    PubMed id range); anything else falls back to a regular set.
+    """
+
+    def __init__(self):
+        self._bits = bytearray()
+        self._other = set()
+
+    @staticmethod
+    def _index(pmid):
+        if pmid.isdigit() and not pmid.startswith('0') and len(pmid) < 10:
+            return int(pmid)
+        return None
+
+    def add(self, pmid):
+        """Add a PMID; return True if it was not in the set yet."""
+        index = self._index(pmid)
+        if index is None:
+            if pmid in self._other:
+                return False
+            self._other.add(pmid)
+            return True
+
+        byte, bit = divmod(index, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        if self._bits[byte] >> bit & 1:
+            return False
+        self._bits[byte] |= 1 << bit
+        return True
+
+    def __contains__(self, pmid):
+        index = self._index(pmid)
+        if index is None:
+            return pmid in self._other
+        byte, bit = divmod(index, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] >> bit & 1)
+
+    def __iter__(self):
+        for byte, value in enumerate(self._bits):
+            if value:
+                for bit in range(8):
+                    if value >> bit & 1:
+                        yield str(byte * 8 + bit)
+        yield from self._other
+
+
+class Neo4jCsvMerger:
+    """
+    Tracks the node and relationship CSV lines merged from every segment.
+    Drops :Article rows for PMIDs already written, with the relationship rows
+    of those duplicate documents, and remembers cited PMIDs, so the
+    reference-only ("ghost") nodes can be appended at the end.
+    """
+
+    def __init__(self):
+        self.articles = PmidSet()
+        self.cited = PmidSet()
+        # Node decisions of the merged segment not yet matched with their relationships
+        self._documents = deque()
+        self._keep_document = True
+
+    def keep_node(self, line):
+        return self.articles.add(line.split(',', 1)[0])
+
+    def keep_edge(self, line):
+        """Record a relationship row of a document whose node row was kept."""
+        self.cited.add(line.split(',', 2)[1])
+        return True
+
+    def node_filter(self, line):
+        """Merge filter of node part files: keep_node, remembered for the document's relationships."""
+        kept = self.keep_node(line)
+        self._documents.append(kept)
+        return kept
+
+    def edge_filter(self, line):
+        """
+        Merge filter of relationship part files, where the rows of every
+        document follow a NEO4J_DOCUMENT_MARKER line. The node part of the
+        segment must be merged first.
+        """
+        if line == NEO4J_DOCUMENT_MARKER:
+            self._keep_document = self._documents.popleft()
+            return False
+        return self._keep_document and self.keep_edge(line)
+
+    def rebuild(self, nodes_file, edges_file):
+        """Reload the sets from CSVs written by an interrupted run."""
+        for path, keep in ((nodes_file, self.keep_node), (edges_file, self.keep_edge)):
+            if Path(path).exists():
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        keep(line)
+
+    def write_ghost_nodes(self, nodes_file):
+        """Append a title-less :Article row for every cited PMID without a document."""
+        count = 0
+        with open(nodes_file, 'a', encoding='utf-8') as f:
+            for pmid in self.cited:
+                if pmid not in self.articles:
+                    f.write(f"{pmid},,,Article\n")
+                    count += 1
+        return count
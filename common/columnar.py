@@ -0,0 +1,109 @@
+"""
+Columnar (Parquet) intermediate written by the converter.
+A columnar directory holds two datasets, each a folder of ordered part files:
+- articles/part-NNNNN.parquet: pmid, title, abstract
+- citations/part-NNNNN.parquet: source_pmid, ref_pmid, doc (the row of the
+  citing article in the articles part of the same name, so that two articles
+  with the same pmid keep separate citation lists)
+Requires pyarrow (pip install pyarrow).
+"""
+
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+BATCH_SIZE = 50000
+TABLES = ('articles', 'citations')
+
+
+def _schemas():
+    return {
+        'articles': pa.schema([('pmid', pa.string()),
+                               ('title', pa.string()),
+                               ('abstract', pa.string())]),
+        'citations': pa.schema([('source_pmid', pa.string()),
+                                ('ref_pmid', pa.string()),
+                                ('doc', pa.int32())]),
+    }
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("The columnar output needs pyarrow: pip install pyarrow")
+
+
+def prepare_columnar_dir(directory, first_part=0):
+    """
+    Create the table folders and remove part files left by a previous run.
+    Parts numbered below `first_part` are kept when resuming a conversion.
+    """
+    _require_pyarrow()
+    for table in TABLES:
+        table_dir = Path(directory) / table
+        table_dir.mkdir(parents=True, exist_ok=True)
+        for old_part in table_dir.glob('part-*.parquet'):
+            if int(old_part.stem.split('-')[1]) >= first_part:
+                old_part.unlink()
+
+
+def part_files(directory, table):
+    """Return the part files of one table in write order."""
+    return sorted((Path(directory) / table).glob('part-*.parquet'))
+
+
+class ColumnarWriter:
+    """Buffers article rows and citation edges and writes them as one Parquet part per table."""
+
+    def __init__(self, directory, part_name, batch_size=BATCH_SIZE):
+        _require_pyarrow()
+        self._schemas = _schemas()
+        self._writers = {
+            table: pq.ParquetWriter(str(Path(directory) / table / f'{part_name}.parquet'),
+                                    self._schemas[table], compression='zstd')
+            for table in TABLES
+        }
+        self._rows = {table: {name: [] for name in self._schemas[table].names}
+                      for table in TABLES}
+        self._batch_size = batch_size
+        self._documents = 0
+
+    def add(self, article):
+        """Add the rows of one article, as returned by extract_article()."""
+        pmid = article['pmid']
+        if not pmid:
+            return
+
+        articles = self._rows['articles']
+        articles['pmid'].append(pmid)
+        articles['title'].append(article['title'])
+        articles['abstract'].append(article['abstract'])
+
+        citations = self._rows['citations']
+        for ref_pmid in article['ref_pmids']:
+            citations['source_pmid'].append(pmid)
+            citations['ref_pmid'].append(ref_pmid)
+            citations['doc'].append(self._documents)
+        self._documents += 1
+
+        for table in TABLES:
+            if len(self._rows[table][self._schemas[table].names[0]]) >= self._batch_size:
+                self._flush(table)
+
+    def _flush(self, table):
+        columns = self._rows[table]
+        if columns[self._schemas[table].names[0]]:
+            batch = pa.record_batch([pa.array(columns[name], self._schemas[table].field(name).type)
+                                     for name in self._schemas[table].names],
+                                    schema=self._schemas[table])
+            self._writers[table].write_batch(batch)
+            for values in columns.values():
+                values.clear()
+
+    def close(self):
+        for table in TABLES:
+            self._flush(table)
+            self._writers[table].close()
@@ -0,0 +1,85 @@
+"""
+Reading converted BioC JSON files.
+Supports both the JSON array written by default and the JSON Lines
+(one compact document per line) output of the converter.
+JSON Lines files are memory-mapped and can be split into line-aligned
+byte ranges so several workers can load one file.
+"""
+
+import json
+import mmap
+import os
+
+
+def is_json_lines(path):
+    """Return True unless the file is a JSON array (first non-blank byte is '[')."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return True
+            stripped = chunk.lstrip()
+            if stripped:
+                return not stripped.startswith(b'[')
+
+
+def split_line_ranges(path, parts):
+    """
+    Split a JSON Lines file into at most `parts` (start, end) byte ranges.
+    Every range starts at the beginning of a line and ends after a newline.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+
+    ranges = []
+    with open(path, 'rb') as f:
+        start = 0
+        for i in range(1, parts + 1):
+            if start >= size:
+                break
+            target = size * i // parts
+            if target <= start:
+                continue
+            f.seek(target)
+            # Move the cut to the end of the line the target falls in
+            if target < size:
+                f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def iter_lines(path, start=0, end=None):
+    """Yield the non-blank lines of a JSON Lines file in [start, end) as raw bytes."""
+    if os.path.getsize(path) == 0:
+        return
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm) if end is None else min(end, len(mm))
+        position = start
+        while position < end:
+            newline = mm.find(b'\n', position, end)
+            if newline == -1:
+                newline = end
+            line = mm[position:newline].strip()
+            if line:
+                yield line
+            position = newline + 1
+
+
+def iter_documents(path, start=0, end=None):
+    """
+    Yield documents from a converted file as dictionaries.
+    `start` and `end` restrict a JSON Lines file to one byte range.
+    """
+    if is_json_lines(path):
+        for line in iter_lines(path, start, end):
+            yield json.loads(line)
+    else:
+        import ijson  # Install with: pip install ijson
+
+        with open(path, 'rb') as f:
+            # ijson.items(f, 'item') handles the [ {}, {}, ... ] structure
+            yield from ijson.items(f, 'item')
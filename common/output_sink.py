@@ -0,0 +1,154 @@
+"""
+Buffered output sink shared by the exporters.
+Lines are gathered into large blocks that a dedicated writer thread writes to
+disk, so formatting never waits on the file system. With compression every
+block is compressed on its own in a thread pool (zlib and zstd release the
+GIL) into a gzip member or a zstd frame; they are written in order, and
+concatenated members or frames decompress as one stream (gzip -d, zstd -d).
+zstd needs the zstandard package (pip install zstandard).
+"""
+
+import gzip
+import io
+import os
+import queue
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+COMPRESSIONS = {'gzip': '.gz', 'zstd': '.zst'}
+BLOCK_SIZE = 8 * 1024 * 1024
+DEFAULT_LEVELS = {'gzip': 6, 'zstd': 3}
+
+
+def output_path(path, compression=None):
+    """Return `path` with the suffix of `compression` appended if it is missing."""
+    suffix = COMPRESSIONS.get(compression, '')
+    path = str(path)
+    return path if path.endswith(suffix) else path + suffix
+
+
+def _block_compressor(compression, level):
+    if compression is None:
+        return None
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of {sorted(COMPRESSIONS)}")
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    if compression == 'gzip':
+        return lambda block: gzip.compress(block, compresslevel=level)
+
+    if zstandard is None:
+        raise ImportError("zstd output needs zstandard: pip install zstandard")
+    # A ZstdCompressor must not be shared between threads
+    local = threading.local()
+
+    def compress(block):
+        if not hasattr(local, 'compressor'):
+            local.compressor = zstandard.ZstdCompressor(level=level)
+        return local.compressor.compress(block)
+    return compress
+
+
+class OutputSink:
+    """
+    Write-only file object for exporter output; accepts str (UTF-8) and bytes.
+    Must be closed (or used as a context manager) to flush the last block.
+    With append=True the blocks are added after the existing content, which
+    stays a valid stream since compressed blocks are independent.
+    """
+
+    def __init__(self, path, compression=None, level=None, threads=None, block_size=BLOCK_SIZE,
+                 append=False):
+        self.path = output_path(path, compression)
+        self._compress = _block_compressor(compression, level)
+        threads = threads or os.cpu_count() or 1
+        self._pool = ThreadPoolExecutor(max_workers=threads) if self._compress else None
+        self._block_size = block_size
+        self._parts = []
+        self._size = 0
+        self._error = None
+        self._closed = False
+        self._file = open(self.path, 'ab' if append else 'wb')
+        # Bounded, so at most a few blocks wait for the disk or the compressors
+        self._queue = queue.Queue(maxsize=threads * 2)
+        self._writer = threading.Thread(target=self._write_loop, name='output-sink', daemon=True)
+        self._writer.start()
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self._parts.append(data)
+        self._size += len(data)
+        if self._size >= self._block_size:
+            self._flush_block()
+        return len(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def _flush_block(self):
+        if self._error:
+            raise self._error
+        if not self._parts:
+            return
+        block = b''.join(self._parts)
+        self._parts = []
+        self._size = 0
+        self._queue.put(self._pool.submit(self._compress, block) if self._pool else block)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error:
+                continue
+            try:
+                self._file.write(item.result() if isinstance(item, Future) else item)
+            except BaseException as e:
+                self._error = e
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._flush_block()
+        finally:
+            self._queue.put(None)
+            self._writer.join()
+            if self._pool:
+                self._pool.shutdown()
+            self._file.close()
+        if self._error:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_output(path, compression=None, level=None, threads=None, append=False):
+    """Open an exporter output file; `compression` is None, 'gzip' or 'zstd'."""
+    return OutputSink(path, compression, level, threads, append=append)
+
+
+def open_input(path):
+    """Open an exporter output file for reading as text, decompressing by suffix."""
+    path = str(path)
+    if path.endswith(COMPRESSIONS['gzip']):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if path.endswith(COMPRESSIONS['zstd']):
+        if zstandard is None:
+            raise ImportError("zstd input needs zstandard: pip install zstandard")
+        reader = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), read_across_frames=True,
+                                                            closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
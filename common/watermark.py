@@ -0,0 +1,51 @@
+"""
+Watermarks of incremental exports.
+An incremental export writes only the documents whose key (SERIAL id, load
+batch, shard number, ...) is past the highest key already in the output file,
+and appends them to it. That key is kept next to the file in
+<output>.watermark, together with the size of the file once written: a
+watermark is ignored when the file was rewritten or removed since, for example
+by a full export, and the next incremental export starts over.
+A backend whose keys restart after a reload (PostgreSQL's SERIAL ids after
+TRUNCATE ... RESTART IDENTITY) also stores a check of the row at the key,
+and the watermark is ignored when that row changed.
+"""
+
+import json
+import os
+from pathlib import Path
+
+
+def watermark_path(output_file):
+    return Path(f"{output_file}.watermark")
+
+
+def load_watermark(output_file, check=None):
+    """
+    Return the highest key already exported to `output_file`, or None.
+    `check`, when given, returns the current check value of a key; it must
+    match the one saved with the watermark.
+    """
+    try:
+        with open(watermark_path(output_file), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return None
+    if not os.path.exists(output_file) or os.path.getsize(output_file) != state['file_size']:
+        print(f"Watermark ignored: {output_file} changed since it was written.")
+        return None
+    if check is not None and check(state['key']) != state.get('check'):
+        print(f"Watermark ignored: the data at key {state['key']} changed since it was written.")
+        return None
+    return state['key']
+
+
+def save_watermark(output_file, key, check=None):
+    """
+    Record `key` (JSON serializable) as the highest key exported to
+    `output_file`, with the `check` value of that key if any.
+    """
+    tmp_path = Path(f"{watermark_path(output_file)}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'file_size': os.path.getsize(output_file), 'key': key, 'check': check}, f)
+    os.replace(tmp_path, watermark_path(output_file))
@@ -5,4 +5,7 @@ CREATE TABLE IF NOT EXISTS bioc_data (
 );
 
 -- Create an index to speed up PMID lookups later
-CREATE INDEX idx_pmid ON bioc_data ((document->'passages'->0->'infons'->>'article-id_pmid'));
\ No newline at end of file
+CREATE INDEX idx_pmid ON bioc_data ((document->'passages'->0->'infons'->>'article-id_pmid'));
+
+-- Used to replace documents when loading a delta file
+CREATE INDEX idx_doc_id ON bioc_data ((document->>'id'));
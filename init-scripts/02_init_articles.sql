@@ -0,0 +1,23 @@
+-- Normalized tables filled by load_to_psql.py --schema normalized|both
+-- (Result 1 and Result 2 are exported from them without touching JSONB)
+-- One articles row per document: citations reference it by id, so documents
+-- sharing a pmid keep separate citation lists, in document order (ord)
+CREATE TABLE IF NOT EXISTS articles (
+    id BIGSERIAL PRIMARY KEY,
+    pmid TEXT NOT NULL,
+    title TEXT,
+    abstract TEXT
+);
+
+CREATE TABLE IF NOT EXISTS citations (
+    article_id BIGINT NOT NULL,
+    ord INTEGER NOT NULL,
+    source_pmid TEXT NOT NULL,
+    ref_pmid TEXT NOT NULL
+);
+
+-- Looked up by the deletes of a delta load (REPLACE_EXISTING); the same
+-- statements are in NORMALIZED_INDEXES of load_to_psql.py, which drops and
+-- rebuilds them around a bulk load
+CREATE INDEX IF NOT EXISTS idx_articles_pmid ON articles (pmid);
+CREATE INDEX IF NOT EXISTS idx_citations_source_pmid ON citations (source_pmid);
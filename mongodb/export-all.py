@@ -0,0 +1,131 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+from pymongo import MongoClient
+
+from load_to_mongo import has_article_fields
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "litcovid_json"
+COLLECTION_NAME = "bio_c_json"
+DATA_OUTPUT_FILE = "mongo_result1.txt"
+REFS_OUTPUT_FILE = "./mongo-refs.txt"
+# auto: plain find() when the documents carry the top-level article fields
+# (load_to_mongo.py --derived or --backfill), the group-free pipeline otherwise
+MODE = "auto"
+
+def find_rows(col):
+    cursor = col.find({"pmid": {"$ne": None}},
+                      {"_id": 0, "pmid": 1, "title": 1, "abstract": 1, "ref_pmids": 1})
+    for doc in cursor:
+        yield (doc['pmid'], (doc.get('title') or "").strip(), (doc.get('abstract') or "").strip(),
+               doc.get('ref_pmids') or [])
+
+def passages_of(section_type, *conditions):
+    return {
+        "$filter": {
+            "input": "$passages",
+            "cond": {"$and": [{"$eq": ["$$this.infons.section_type", section_type]}, *conditions]}
+        }
+    }
+
+def filter_rows(col):
+    # Title, abstract and references computed inside each document with
+    # $filter/$map/$reduce/$setUnion: one streaming pass, no $unwind or $group
+    pipeline = [
+        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}}},
+        {"$project": {
+            "_id": 0,
+            "pmid": {"$max": "$passages.infons.article-id_pmid"},
+            "title": {
+                "$max": {
+                    "$map": {
+                        "input": "$passages",
+                        "in": {"$cond": [{"$eq": ["$$this.infons.section_type", "TITLE"]},
+                                         "$$this.text", ""]}
+                    }
+                }
+            },
+            "abstract": {
+                "$reduce": {
+                    "input": passages_of("ABSTRACT",
+                                         {"$gt": [{"$strLenCP": {"$ifNull": ["$$this.text", ""]}}, 0]}),
+                    "initialValue": "",
+                    "in": {"$cond": [{"$eq": ["$$value", ""]},
+                                     "$$this.text",
+                                     {"$concat": ["$$value", " ", "$$this.text"]}]}
+                }
+            },
+            "refs": {
+                "$setUnion": [{
+                    "$map": {
+                        "input": passages_of("REF",
+                                             {"$gt": ["$$this.infons.pub-id_pmid", None]},
+                                             {"$ne": ["$$this.infons.pub-id_pmid", ""]}),
+                        "in": "$$this.infons.pub-id_pmid"
+                    }
+                }]
+            }
+        }},
+        {"$match": {"pmid": {"$ne": None}}}
+    ]
+    for doc in col.aggregate(pipeline):
+        yield (doc['pmid'], (doc.get('title') or "").strip(), (doc.get('abstract') or "").strip(),
+               doc.get('refs') or [])
+
+ROW_SOURCES = {"find": find_rows, "filter": filter_rows}
+
+def export_mongodb_all(mode=MODE, compression=None):
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    col = db[COLLECTION_NAME]
+
+    print(f"🚀 Exporting {DATA_OUTPUT_FILE} and {REFS_OUTPUT_FILE} in a single pass...")
+    start_time = time.perf_counter()
+
+    try:
+        if mode == "auto":
+            mode = "find" if has_article_fields(col) else "filter"
+        print(f"Export mode: {mode}")
+        count = 0
+        refs_count = 0
+
+        with open_output(DATA_OUTPUT_FILE, compression) as data_file, \
+                open_output(REFS_OUTPUT_FILE, compression) as refs_file:
+            for pmid, title, full_abstract, raw_refs in ROW_SOURCES[mode](col):
+                # Clean up internal newlines to keep the "one line per article" format
+                line = f"{pmid}/{title} {full_abstract}"
+                data_file.write(" ".join(line.splitlines()) + "\n")
+                count += 1
+
+                # Same cleanup as export-refs.py: no empty values, no duplicates, sorted
+                clean_refs = sorted(set(str(r) for r in raw_refs if r))
+                if clean_refs:
+                    refs_file.write(f"{pmid}/{'/'.join(clean_refs)}\n")
+                    refs_count += 1
+
+                if count % 10000 == 0:
+                    print(f"📦 Exported {count} data rows...")
+
+        duration = time.perf_counter() - start_time
+        print(f"✅ SUCCESS: Exported {count} data lines and {refs_count} reference lines "
+              f"in {duration:.2f} seconds.")
+
+    except Exception as e:
+        print(f"❌ ERROR: {e}")
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Result 1 and Result 2 from MongoDB in one pass.")
+    parser.add_argument("--mode", choices=["auto", *ROW_SOURCES], default=MODE)
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write both outputs compressed in parallel blocks")
+    args = parser.parse_args()
+    export_mongodb_all(args.mode, args.compress)
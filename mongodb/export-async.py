@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+from pymongo import AsyncMongoClient, MongoClient
+
+from load_to_mongo import has_article_fields
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.async_export import BATCH_SIZE, QUEUE_SIZE, run_export  # noqa: E402
+from common.output_sink import COMPRESSIONS  # noqa: E402
+
+# --- CONFIGURATION ---
+# Queries, formatting, connection settings and output files are those of the
+# synchronous exporters, so both produce the same files
+EXPORTERS = {"data": "export-data", "refs": "export-refs"}
+CURSOR_BATCH_SIZE = 2000
+
+async def fetch_rows(exporter, mode, cursor_batch_size):
+    client = AsyncMongoClient(exporter.MONGO_URI)
+    try:
+        col = client[exporter.DB_NAME][exporter.COLLECTION_NAME]
+        method, build_query, to_row = exporter.QUERIES[mode]
+        if method == "find":
+            cursor = col.find(*build_query(), batch_size=cursor_batch_size)
+        else:
+            cursor = await col.aggregate(build_query(), allowDiskUse=True,
+                                         batchSize=cursor_batch_size)
+        async for doc in cursor:
+            yield to_row(doc)
+    finally:
+        await client.close()
+
+def resolve_mode(exporter, mode):
+    if mode != "auto":
+        return mode
+    client = MongoClient(exporter.MONGO_URI)
+    try:
+        col = client[exporter.DB_NAME][exporter.COLLECTION_NAME]
+        return "find" if has_article_fields(col) else "filter"
+    finally:
+        client.close()
+
+def export_async(task, mode="auto", batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE,
+                 cursor_batch_size=CURSOR_BATCH_SIZE, compression=None):
+    exporter = importlib.import_module(EXPORTERS[task])
+    mode = resolve_mode(exporter, mode)
+    print(f"Exporting {task} to {exporter.OUTPUT_FILE} with the async driver (mode: {mode})...")
+    rows = fetch_rows(exporter, mode, cursor_batch_size)
+    count = asyncio.run(run_export(rows, exporter.format_row, exporter.OUTPUT_FILE,
+                                   batch_size, queue_size, compression=compression))
+    print(f"SUCCESS: Exported {count} lines.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export Result 1 or Result 2 from MongoDB with overlapping fetch, format and write.")
+    parser.add_argument("task", choices=sorted(EXPORTERS))
+    parser.add_argument("--mode", choices=["auto", "find", "filter", "aggregate"], default="auto")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="batches buffered between two stages")
+    parser.add_argument("--cursor-batch-size", type=int, default=CURSOR_BATCH_SIZE,
+                        help="documents per getMore round trip")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    export_async(args.task, args.mode, args.batch_size, args.queue_size, args.cursor_batch_size,
+                 args.compress)
@@ -1,26 +1,45 @@
+import argparse
+import sys
 import time
+from pathlib import Path
 from pymongo import MongoClient
 
+from incremental_export import export_incremental
+from load_to_mongo import has_article_fields
+from parallel_export import export_parallel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "litcovid_json"
 COLLECTION_NAME = "bio_c_json" 
 OUTPUT_FILE = "mongo_result1.txt"
+# auto: plain find() when the documents carry the top-level article fields
+# (load_to_mongo.py --derived or --backfill), the group-free "filter" pipeline
+# otherwise; "aggregate" is the original $unwind/$group pipeline, kept for comparison
+MODE = "auto"
 
-def export_mongodb_data():
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    col = db[COLLECTION_NAME]
+# Each mode is a query (find filter and projection, or a pipeline) and the
+# conversion of its result documents into (pmid, title, abstract) rows
 
-    print(f"🚀 Starting optimized data export (PMID/Title/Abstract) to {OUTPUT_FILE}...")
-    start_time = time.perf_counter()
+def find_query(match=None):
+    # The fields are precomputed: no $unwind, no $group, nothing spilled to disk
+    return ({"pmid": {"$ne": None}, **(match or {})},
+            {"_id": 0, "pmid": 1, "title": 1, "abstract": 1})
+
+def find_row(doc):
+    return doc['pmid'], (doc.get('title') or "").strip(), (doc.get('abstract') or "").strip()
 
+def aggregate_pipeline(match=None):
     # The Pipeline logic:
     # 1. Match docs with PMID (using your index)
     # 2. Unwind passages to treat each block individually
     # 3. Group by the original document ID to rebuild the specific strings we need
     pipeline = [
-        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}}},
+        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}, **(match or {})}},
         {"$unwind": "$passages"},
         {"$group": {
             "_id": "$_id",
@@ -50,29 +69,107 @@ def export_mongodb_data():
         # Filter out documents that somehow ended up without a PMID
         {"$match": {"pmid": {"$ne": None}}}
     ]
+    return pipeline
+
+def aggregate_row(doc):
+    # Filter out None values and join the abstract parts
+    abstracts = [a for a in doc.get('abstract_parts', []) if a]
+    return doc.get('pmid'), doc.get('title', "").strip(), " ".join(abstracts).strip()
+
+def filter_pipeline(match=None):
+    # Same fields as aggregate_rows(), computed inside each document with
+    # $filter/$map/$reduce over its passages: no $unwind and no $group, so the
+    # results stream in natural order without a blocking stage
+    pipeline = [
+        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}, **(match or {})}},
+        {"$project": {
+            "_id": 0,
+            "pmid": {"$max": "$passages.infons.article-id_pmid"},
+            "title": {
+                "$max": {
+                    "$map": {
+                        "input": "$passages",
+                        "in": {"$cond": [{"$eq": ["$$this.infons.section_type", "TITLE"]},
+                                         "$$this.text", ""]}
+                    }
+                }
+            },
+            "abstract": {
+                "$reduce": {
+                    "input": {
+                        "$filter": {
+                            "input": "$passages",
+                            "cond": {"$and": [
+                                {"$eq": ["$$this.infons.section_type", "ABSTRACT"]},
+                                {"$gt": [{"$strLenCP": {"$ifNull": ["$$this.text", ""]}}, 0]}
+                            ]}
+                        }
+                    },
+                    "initialValue": "",
+                    "in": {"$cond": [{"$eq": ["$$value", ""]},
+                                     "$$this.text",
+                                     {"$concat": ["$$value", " ", "$$this.text"]}]}
+                }
+            }
+        }},
+        {"$match": {"pmid": {"$ne": None}}}
+    ]
+    return pipeline
+
+filter_row = find_row
+
+def find_rows(col, match=None):
+    return map(find_row, col.find(*find_query(match)))
+
+def filter_rows(col, match=None):
+    return map(filter_row, col.aggregate(filter_pipeline(match)))
+
+def aggregate_rows(col, match=None):
+    return map(aggregate_row, col.aggregate(aggregate_pipeline(match), allowDiskUse=True))
+
+ROW_SOURCES = {"find": find_rows, "filter": filter_rows, "aggregate": aggregate_rows}
+# For other drivers (export-async.py): mode -> (collection method, query builder, row conversion)
+QUERIES = {
+    "find": ("find", find_query, find_row),
+    "filter": ("aggregate", filter_pipeline, filter_row),
+    "aggregate": ("aggregate", aggregate_pipeline, aggregate_row),
+}
+
+def format_row(row):
+    pmid, title, full_abstract = row
+    # Clean up internal newlines to keep the "one line per article" format
+    line = f"{pmid}/{title} {full_abstract}"
+    return " ".join(line.splitlines()) + "\n"
+
+def export_mongodb_data(mode=MODE, workers=1, compression=None, incremental=False):
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    col = db[COLLECTION_NAME]
+
+    print(f"🚀 Starting optimized data export (PMID/Title/Abstract) to {OUTPUT_FILE}...")
+    start_time = time.perf_counter()
 
     try:
-        cursor = col.aggregate(pipeline, allowDiskUse=True)
-        count = 0
-        
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            for doc in cursor:
-                pmid = doc.get('pmid')
-                title = doc.get('title', "").strip()
-                
-                # Filter out None values and join the abstract parts
-                abstracts = [a for a in doc.get('abstract_parts', []) if a]
-                full_abstract = " ".join(abstracts).strip()
-                
-                # Clean up internal newlines to keep the "one line per article" format
-                line = f"{pmid}/{title} {full_abstract}"
-                cleaned_line = " ".join(line.splitlines())
-                
-                f.write(cleaned_line + "\n")
-                count += 1
-                
-                if count % 10000 == 0 and count > 0:
-                    print(f"📦 Exported {count} data rows...")
+        if mode == "auto":
+            mode = "find" if has_article_fields(col) else "filter"
+        print(f"Export mode: {mode}")
+        if incremental:
+            # Only the documents loaded since the last incremental export, appended
+            count = export_incremental(MONGO_URI, DB_NAME, COLLECTION_NAME, ROW_SOURCES[mode],
+                                       format_row, OUTPUT_FILE, compression)
+        elif workers > 1:
+            # One cursor per _id range, each in its own process
+            count = export_parallel(MONGO_URI, DB_NAME, COLLECTION_NAME, ROW_SOURCES[mode],
+                                    format_row, OUTPUT_FILE, workers, compression=compression)
+        else:
+            count = 0
+            with open_output(OUTPUT_FILE, compression) as f:
+                for row in ROW_SOURCES[mode](col):
+                    f.write(format_row(row))
+                    count += 1
+
+                    if count % 10000 == 0 and count > 0:
+                        print(f"📦 Exported {count} data rows...")
 
         duration = time.perf_counter() - start_time
         print(f"✅ SUCCESS: Exported {count} lines in {duration:.2f} seconds.")
@@ -83,4 +180,13 @@ def export_mongodb_data():
         client.close()
 
 if __name__ == "__main__":
-    export_mongodb_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export PMID/Title Abstract lines from MongoDB.")
+    parser.add_argument("--mode", choices=["auto", *ROW_SOURCES], default=MODE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split the collection into _id ranges exported in parallel")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the documents loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    export_mongodb_data(args.mode, args.workers, args.compress, args.incremental)
\ No newline at end of file
@@ -1,24 +1,44 @@
+import argparse
+import sys
 import time
+from pathlib import Path
 from pymongo import MongoClient
 
+from incremental_export import export_incremental
+from load_to_mongo import has_article_fields
+from parallel_export import export_parallel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 MONGO_URI = "mongodb://localhost:27017/"
 DB_NAME = "litcovid_json"
 # ATTENTION : Vérifiez si votre collection s'appelle 'litcovid' ou 'bio_c_json'
 COLLECTION_NAME = "bio_c_json" 
 OUTPUT_FILE = "./mongo-refs.txt"
+# auto : find() simple si les documents portent les champs pmid/ref_pmids
+# (load_to_mongo.py --derived ou --backfill), le pipeline sans groupement
+# "filter" sinon ; "aggregate" est le pipeline $unwind/$group d'origine
+MODE = "auto"
 
-def export_mongo_refs():
-    client = MongoClient(MONGO_URI)
-    db = client[DB_NAME]
-    col = db[COLLECTION_NAME]
+# Chaque mode est une requête (filtre et projection de find, ou pipeline) et
+# la conversion de ses documents résultats en lignes (source, refs)
 
-    start_time = time.perf_counter()
+def find_query(match=None):
+    # Champs précalculés : ni $unwind ni $group, rien n'est écrit sur disque
+    return ({"pmid": {"$ne": None}, "ref_pmids.0": {"$exists": True}, **(match or {})},
+            {"_id": 0, "pmid": 1, "ref_pmids": 1})
+
+def find_row(doc):
+    return doc['pmid'], doc['ref_pmids']
 
+def aggregate_pipeline(match=None):
     # Pipeline complète pour extraire les PMIDs sources et les références
     pipeline = [
         # 1. On filtre les docs qui ont un PMID (Utilise votre INDEX)
-        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}}},
+        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}, **(match or {})}},
         
         # 2. On transforme chaque passage en un document séparé
         {"$unwind": "$passages"},
@@ -46,24 +66,100 @@ def export_mongo_refs():
         # 5. On ne garde que les articles qui ont au moins une référence
         {"$match": {"source": {"$ne": None}}}
     ]
+    return pipeline
+
+def aggregate_row(doc):
+    return doc.get('source'), doc.get('refs', [])
+
+def filter_pipeline(match=None):
+    # Références calculées dans chaque document avec $filter/$map/$setUnion :
+    # ni $unwind ni $group, les résultats arrivent en flux, dans l'ordre naturel
+    pipeline = [
+        {"$match": {"passages.infons.article-id_pmid": {"$exists": True}, **(match or {})}},
+        {"$project": {
+            "_id": 0,
+            "source": {"$max": "$passages.infons.article-id_pmid"},
+            "refs": {
+                "$setUnion": [{
+                    "$map": {
+                        "input": {
+                            "$filter": {
+                                "input": "$passages",
+                                "cond": {"$and": [
+                                    {"$eq": ["$$this.infons.section_type", "REF"]},
+                                    {"$gt": ["$$this.infons.pub-id_pmid", None]},
+                                    {"$ne": ["$$this.infons.pub-id_pmid", ""]}
+                                ]}
+                            }
+                        },
+                        "in": "$$this.infons.pub-id_pmid"
+                    }
+                }]
+            }
+        }},
+        {"$match": {"source": {"$ne": None}, "refs.0": {"$exists": True}}}
+    ]
+    return pipeline
+
+def filter_row(doc):
+    return doc['source'], doc['refs']
+
+def find_rows(col, match=None):
+    return map(find_row, col.find(*find_query(match)))
+
+def filter_rows(col, match=None):
+    return map(filter_row, col.aggregate(filter_pipeline(match)))
+
+def aggregate_rows(col, match=None):
+    return map(aggregate_row, col.aggregate(aggregate_pipeline(match), allowDiskUse=True))
+
+ROW_SOURCES = {"find": find_rows, "filter": filter_rows, "aggregate": aggregate_rows}
+# Pour les autres pilotes (export-async.py) : mode -> (méthode de la collection,
+# construction de la requête, conversion des lignes)
+QUERIES = {
+    "find": ("find", find_query, find_row),
+    "filter": ("aggregate", filter_pipeline, filter_row),
+    "aggregate": ("aggregate", aggregate_pipeline, aggregate_row),
+}
+
+def format_row(row):
+    source, raw_refs = row
+    # Nettoyage de la liste des références (enlève les None et doublons)
+    clean_refs = sorted(list(set([str(r) for r in raw_refs if r])))
+    if source and clean_refs:
+        return f"{source}/{'/'.join(clean_refs)}\n"
+    return None
+
+def export_mongo_refs(mode=MODE, workers=1, compression=None, incremental=False):
+    client = MongoClient(MONGO_URI)
+    db = client[DB_NAME]
+    col = db[COLLECTION_NAME]
+
+    start_time = time.perf_counter()
 
     try:
-        cursor = col.aggregate(pipeline, allowDiskUse=True)
-        count = 0
-        
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            for doc in cursor:
-                source = doc.get('source')
-                # Nettoyage de la liste des références (enlève les None et doublons)
-                raw_refs = doc.get('refs', [])
-                clean_refs = sorted(list(set([str(r) for r in raw_refs if r])))
-
-                if source and clean_refs:
-                    f.write(f"{source}/{'/'.join(clean_refs)}\n")
-                    count += 1
-                
-                if count % 5000 == 0 and count > 0:
-                    print(f"Lignes exportées : {count}...")
+        if mode == "auto":
+            mode = "find" if has_article_fields(col) else "filter"
+        print(f"Mode d'export : {mode}")
+        if incremental:
+            # Seulement les documents chargés depuis le dernier export incrémental, ajoutés au fichier
+            count = export_incremental(MONGO_URI, DB_NAME, COLLECTION_NAME, ROW_SOURCES[mode],
+                                       format_row, OUTPUT_FILE, compression)
+        elif workers > 1:
+            # Un curseur par plage d'_id, chacun dans son propre processus
+            count = export_parallel(MONGO_URI, DB_NAME, COLLECTION_NAME, ROW_SOURCES[mode],
+                                    format_row, OUTPUT_FILE, workers, compression=compression)
+        else:
+            count = 0
+            with open_output(OUTPUT_FILE, compression) as f:
+                for row in ROW_SOURCES[mode](col):
+                    line = format_row(row)
+                    if line is not None:
+                        f.write(line)
+                        count += 1
+
+                    if count % 5000 == 0 and count > 0:
+                        print(f"Lignes exportées : {count}...")
 
         duration = time.perf_counter() - start_time
         print(f"SUCCÈS : {count} lignes exportées en {duration:.2f} secondes.")
@@ -74,4 +170,13 @@ def export_mongo_refs():
         client.close()
 
 if __name__ == "__main__":
-    export_mongo_refs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export PMID/Ref1/Ref2/... lines from MongoDB.")
+    parser.add_argument("--mode", choices=["auto", *ROW_SOURCES], default=MODE)
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split the collection into _id ranges exported in parallel")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the documents loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    export_mongo_refs(args.mode, args.workers, args.compress, args.incremental)
\ No newline at end of file
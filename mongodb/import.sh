@@ -1,5 +1,23 @@
 #!/bin/bash
 
+# Either the JSON array or the JSON Lines output of the converter
+FILE=../data/mongo/litcovid2BioCJSON-converted
+# Use MODE=upsert when FILE is a delta written with --previous-manifest,
+# so changed documents replace their previous version (matched on "id")
+MODE=${MODE:-insert}
+
+# mongoimport reads JSON Lines natively; only a JSON array needs --jsonArray
+FORMAT_ARGS=""
+if [ "$(head -c 4096 "$FILE" | tr -d '[:space:]' | head -c 1)" = "[" ]; then
+    FORMAT_ARGS="--jsonArray"
+fi
+MODE_ARGS="--mode $MODE"
+if [ "$MODE" != "insert" ]; then
+    MODE_ARGS="$MODE_ARGS --upsertFields id"
+    # Without an index on "id" every upserted document is a collection scan
+    mongosh --quiet litcovid_json --eval 'db.bio_c_json.createIndex({id: 1})'
+fi
+
 echo "Importing data into MongoDB..."
-mongoimport --db litcovid_json --collection bio_c_json --file ../data/mongo/litcovid2BioCJSON-converted --jsonArray
-echo "Data imported successfully!"
\ No newline at end of file
+mongoimport --db litcovid_json --collection bio_c_json --file "$FILE" $FORMAT_ARGS --numInsertionWorkers "$(nproc)" $MODE_ARGS
+echo "Data imported successfully!"
@@ -0,0 +1,94 @@
+"""
+Incremental export of the MongoDB collection.
+The watermark is the load_batch field that load_to_mongo.py sets on every
+document, or the ObjectId _id of a collection loaded by mongoimport (ObjectIds
+start with their creation time). Only the documents past the watermark of the
+previous incremental export, up to the current highest value, are exported and
+appended to the output file; without a valid watermark the whole collection is
+exported and the file rewritten.
+A load still running while exporting may add documents to the last batch
+after it was exported: run the incremental export once the load is done.
+Documents replaced by a delta load (load_to_mongo.py --replace) keep their
+load_batch, so their new content needs a full export.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+from bson import ObjectId
+from pymongo import DESCENDING, MongoClient
+
+from load_to_mongo import LOAD_BATCH_FIELD
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output, output_path  # noqa: E402
+from common.watermark import load_watermark, save_watermark  # noqa: E402
+
+
+def watermark_field(col):
+    """Return the field the documents are ordered by in load order."""
+    if col.find_one({LOAD_BATCH_FIELD: {"$exists": True}}, {"_id": 1}) is not None:
+        return LOAD_BATCH_FIELD
+    doc = col.find_one({}, {"_id": 1})
+    if doc is None or isinstance(doc["_id"], ObjectId):
+        return "_id"
+    raise ValueError(f"Neither {LOAD_BATCH_FIELD} nor ObjectId _ids to follow the loads: "
+                     f"reload the collection with load_to_mongo.py")
+
+
+def _to_json(value):
+    return str(value) if isinstance(value, ObjectId) else value
+
+
+def _from_json(field, value):
+    return ObjectId(value) if field == "_id" else value
+
+
+def watermark_match(field, after, high):
+    """Query filter for after < field <= high; documents without the field count as old."""
+    if after is None:
+        return {"$nor": [{field: {"$gt": high}}]}
+    return {field: {"$gt": after, "$lte": high}}
+
+
+def export_incremental(mongo_uri, db_name, collection_name, row_source, format_row,
+                       output_file, compression=None):
+    """
+    Run `row_source(col, match)` on the documents past the watermark of
+    `output_file` and append the lines to it. `format_row` turns a row into
+    an output line, or None to skip it.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    path = output_path(output_file, compression)
+    client = MongoClient(mongo_uri)
+    try:
+        col = client[db_name][collection_name]
+        field = watermark_field(col)
+        # The watermark is [field, value]; a different field means a reload
+        previous = load_watermark(path)
+        after = _from_json(field, previous[1]) if previous and previous[0] == field else None
+
+        last = col.find_one({}, {field: 1}, sort=[(field, DESCENDING)])
+        high = last.get(field) if last else None
+        if high is None or (after is not None and high <= after):
+            print(f"Nothing to export: no documents past {field} {_to_json(after)}.")
+            return 0
+        print(f"Exporting documents up to {field} {_to_json(high)} "
+              f"({'appending' if after is not None else 'full export'})...")
+
+        count = 0
+        with open_output(output_file, compression, append=after is not None) as f:
+            for row in row_source(col, watermark_match(field, after, high)):
+                line = format_row(row)
+                if line is not None:
+                    f.write(line)
+                    count += 1
+    finally:
+        client.close()
+
+    save_watermark(path, [field, _to_json(high)])
+    print(f"Exported {count} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return count
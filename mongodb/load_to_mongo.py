@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from pymongo import ASCENDING, InsertOne, MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.articles import extract_article  # noqa: E402
+from common.bulk_formats import mongo_document  # noqa: E402
+from common.ndjson import is_json_lines, iter_documents, iter_lines  # noqa: E402
+
+# --- CONFIGURATION ---
+MONGO_URI = "mongodb://localhost:27017/"
+DB_NAME = "litcovid_json"
+COLLECTION_NAME = "bio_c_json"
+# Either the JSON array or the JSON Lines output of the converter
+FILE_PATH = '../data/mongo/litcovid2BioCJSON-converted'
+BATCH_SIZE = 1000
+WORKERS = 8
+# Set to True when FILE_PATH is a delta written with --previous-manifest:
+# documents whose id is already loaded are replaced (keeping their
+# load_batch) instead of rejected as duplicates
+REPLACE_EXISTING = False
+# Add pmid/title/abstract/ref_pmids at top level of every document
+DERIVED_FIELDS = False
+# Set on every document to the start time of the load that inserted it; the
+# incremental exports (--incremental) use it as their watermark
+LOAD_BATCH_FIELD = "load_batch"
+# Built once the documents are loaded
+INDEXES = ["passages.infons.article-id_pmid", LOAD_BATCH_FIELD]
+DERIVED_INDEXES = ["pmid"]
+
+DUPLICATE_KEY = 11000
+
+def checkpoint_path(path):
+    return Path(f"{path}.mongo-checkpoint")
+
+def load_checkpoint(path):
+    """Return the number of documents already loaded from `path` by an interrupted run."""
+    try:
+        with open(checkpoint_path(path), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        return 0
+    if state.get('file_size') != os.path.getsize(path):
+        print("Checkpoint ignored: the input file changed since it was written.")
+        return 0
+    return state['documents']
+
+def save_checkpoint(path, documents):
+    tmp_path = Path(f"{checkpoint_path(path)}.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'file_size': os.path.getsize(path), 'documents': documents}, f)
+    os.replace(tmp_path, checkpoint_path(path))
+
+def stream_documents(path, skip=0):
+    """Yield documents, skipping the first `skip` ones (JSON Lines are skipped undecoded)."""
+    if is_json_lines(path):
+        for index, line in enumerate(iter_lines(path)):
+            if index >= skip:
+                yield json.loads(line)
+        return
+
+    for index, doc in enumerate(iter_documents(path)):
+        if index >= skip:
+            yield doc
+
+def prepare(doc, derived, load_batch):
+    # The BioC document id becomes _id, so a batch sent twice after a
+    # failure is rejected as duplicates instead of being loaded twice
+    if derived:
+        doc = mongo_document(doc, extract_article(doc))
+    if 'id' in doc and '_id' not in doc:
+        doc['_id'] = doc['id']
+    doc[LOAD_BATCH_FIELD] = load_batch
+    return doc
+
+def replace_operation(doc):
+    """
+    Upsert `doc` by _id. A replaced document keeps the load_batch of its first
+    load, like the SERIAL id of a row replaced by load_to_psql.py.
+    """
+    fields = {key: value for key, value in doc.items() if key != LOAD_BATCH_FIELD}
+    load_batch = {'$ifNull': [f"${LOAD_BATCH_FIELD}", doc[LOAD_BATCH_FIELD]]}
+    # $literal: BioC text starting with "$" must not be read as a field path
+    return UpdateOne({'_id': doc['_id']},
+                     [{'$replaceWith': {'$mergeObjects': [{'$literal': fields},
+                                                          {LOAD_BATCH_FIELD: load_batch}]}}],
+                     upsert=True)
+
+def insert_batch(collection, batch, replace=False):
+    """Write a batch; return the number of documents rejected because their _id is already loaded."""
+    if replace:
+        collection.bulk_write([replace_operation(doc) if '_id' in doc else InsertOne(doc)
+                               for doc in batch], ordered=False)
+        return 0
+    try:
+        collection.insert_many(batch, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get('writeErrors', [])
+        if any(error['code'] != DUPLICATE_KEY for error in errors):
+            raise
+        return len(batch) - e.details.get('nInserted', 0)
+    return 0
+
+def send_batch(collection, start, batch, replace):
+    return start, len(batch), insert_batch(collection, batch, replace)
+
+def build_indexes(collection, derived):
+    indexes = INDEXES + (DERIVED_INDEXES if derived else [])
+    print(f"Building indexes: {', '.join(indexes)}...")
+    start_time = time.perf_counter()
+    for field in indexes:
+        collection.create_index([(field, ASCENDING)])
+    print(f"Indexes built in {time.perf_counter() - start_time:.2f} seconds.")
+
+def load_to_mongo(path=FILE_PATH, batch_size=BATCH_SIZE, workers=WORKERS,
+                  derived=DERIVED_FIELDS, resume=False, replace=REPLACE_EXISTING):
+    """
+    Load the converted documents with unordered insert_many batches sent from
+    a thread pool, then build the indexes.
+    The number of documents acknowledged in file order is checkpointed after
+    every batch, so an interrupted load restarts where it stopped with resume=True.
+    Documents whose id is already loaded are rejected, which is expected for
+    the batches sent again on resume; with replace=True (a delta file) they
+    are replaced instead.
+    """
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME][COLLECTION_NAME]
+
+    loaded = load_checkpoint(path) if resume else 0
+    if loaded:
+        print(f"Resuming after {loaded} documents already loaded.")
+    print(f"Starting import of {path} ({batch_size} documents per batch, {workers} workers)...")
+    start_time = time.perf_counter()
+    load_batch = int(time.time())
+    session_count = 0
+    duplicates = 0
+
+    # Batches can finish out of order: only the prefix of the file whose
+    # batches are all acknowledged is checkpointed
+    finished = {}
+    next_start = loaded
+
+    def collect(done):
+        nonlocal loaded, session_count, duplicates
+        for future in done:
+            start, count, rejected = future.result()
+            finished[start] = count
+            session_count += count - rejected
+            duplicates += rejected
+        while loaded in finished:
+            loaded += finished.pop(loaded)
+        save_checkpoint(path, loaded)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            batch = []
+            for doc in stream_documents(path, skip=loaded):
+                batch.append(prepare(doc, derived, load_batch))
+                if len(batch) >= batch_size:
+                    pending.add(pool.submit(send_batch, collection, next_start, batch, replace))
+                    next_start += len(batch)
+                    batch = []
+                    if len(pending) >= workers * 2:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(done)
+                        rate = session_count / (time.perf_counter() - start_time)
+                        print(f"Imported {session_count} documents ({rate:.0f} docs/s)...")
+            if batch:
+                pending.add(pool.submit(send_batch, collection, next_start, batch, replace))
+            collect(wait(pending).done)
+
+        duration = time.perf_counter() - start_time
+        print(f"SUCCESS: Imported {session_count} documents total in {duration:.2f} seconds "
+              f"({session_count / duration:.0f} docs/s).")
+        if duplicates and resume:
+            print(f"{duplicates} documents were already loaded by the interrupted run.")
+        elif duplicates:
+            print(f"WARNING: {duplicates} documents were not loaded: their id is already in "
+                  f"the collection. Load a delta file with --replace.")
+
+        build_indexes(collection, derived)
+        checkpoint_path(path).unlink(missing_ok=True)
+    finally:
+        client.close()
+
+def has_article_fields(collection):
+    """
+    Return True when every document carries the top-level article fields,
+    written by --derived or --backfill (pmid is set, possibly to null, on each one).
+    """
+    if collection.find_one({"pmid": {"$exists": True}}, {"_id": 1}) is None:
+        return False
+    return collection.find_one({"pmid": {"$exists": False}}, {"_id": 1}) is None
+
+def backfill_article_fields(batch_size=BATCH_SIZE):
+    """
+    Add the top-level article fields to documents loaded without them.
+    Only documents still missing `pmid` are read, so an interrupted backfill
+    simply continues when run again.
+    """
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME][COLLECTION_NAME]
+    try:
+        print("Backfilling pmid/title/abstract/ref_pmids...")
+        start_time = time.perf_counter()
+        count = 0
+        updates = []
+        cursor = collection.find({"pmid": {"$exists": False}}, {"passages": 1}, batch_size=batch_size)
+        for doc in cursor:
+            updates.append(UpdateOne({"_id": doc["_id"]}, {"$set": extract_article(doc)}))
+            if len(updates) >= batch_size:
+                collection.bulk_write(updates, ordered=False)
+                count += len(updates)
+                updates = []
+                rate = count / (time.perf_counter() - start_time)
+                print(f"Updated {count} documents ({rate:.0f} docs/s)...")
+        if updates:
+            collection.bulk_write(updates, ordered=False)
+            count += len(updates)
+
+        print(f"Updated {count} documents in {time.perf_counter() - start_time:.2f} seconds.")
+        build_indexes(collection, derived=True)
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load converted BioC JSON into MongoDB.")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="concurrent insert_many batches")
+    parser.add_argument("--derived", action="store_true", default=DERIVED_FIELDS,
+                        help="add pmid/title/abstract/ref_pmids at top level")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an interrupted load from its checkpoint")
+    parser.add_argument("--replace", action="store_true", default=REPLACE_EXISTING,
+                        help="replace the documents already loaded (a delta file) instead of skipping them")
+    parser.add_argument("--backfill", action="store_true",
+                        help="add the article fields to the documents already loaded, then exit")
+    args = parser.parse_args()
+
+    if args.backfill:
+        backfill_article_fields(args.batch_size)
+    else:
+        load_to_mongo(args.file_path, args.batch_size, args.workers, args.derived, args.resume,
+                      args.replace)
@@ -0,0 +1,102 @@
+"""
+Partitioned export of the MongoDB collection.
+$bucketAuto samples the _id split points, then one worker process per _id
+range runs the exporter's query restricted to that range over its own client
+and writes a shard file; the shards are concatenated in _id order.
+Ranges compare _id values of one type: a collection loaded by load_to_mongo.py
+(string ids) or by mongoimport (ObjectIds), not a mix of both.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+from pymongo import MongoClient
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output  # noqa: E402
+
+
+def id_ranges(col, parts):
+    """Return at most `parts` (low, high) _id bounds; None leaves a side open."""
+    buckets = list(col.aggregate([
+        {"$project": {"_id": 1}},
+        {"$bucketAuto": {"groupBy": "$_id", "buckets": parts}},
+    ], allowDiskUse=True))
+    if not buckets:
+        return []
+    bounds = [None] + [bucket["_id"]["min"] for bucket in buckets[1:]] + [None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def range_filter(low, high):
+    """Query filter for low <= _id < high."""
+    condition = {}
+    if low is not None:
+        condition["$gte"] = low
+    if high is not None:
+        condition["$lt"] = high
+    return {"_id": condition} if condition else {}
+
+
+def shard_path(output_file, index):
+    return f"{output_file}.part-{index:03d}"
+
+
+def _export_range(task):
+    mongo_uri, db_name, collection_name, row_source, format_row, low, high, shard_file = task
+    client = MongoClient(mongo_uri)
+    try:
+        count = 0
+        col = client[db_name][collection_name]
+        with open(shard_file, "w", encoding="utf-8") as f:
+            for row in row_source(col, range_filter(low, high)):
+                line = format_row(row)
+                if line is not None:
+                    f.write(line)
+                    count += 1
+        return count
+    finally:
+        client.close()
+
+
+def export_parallel(mongo_uri, db_name, collection_name, row_source, format_row,
+                    output_file, workers, merge=True, compression=None):
+    """
+    Run `row_source(col, match)` on `workers` _id ranges at once, one process
+    and one client each. `format_row` turns a row into an output line, or None
+    to skip it. With merge=True the shards are concatenated into `output_file`
+    in _id order and removed; otherwise they are left as <output_file>.part-NNN.
+    `compression` applies to the merged file.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    client = MongoClient(mongo_uri)
+    try:
+        ranges = id_ranges(client[db_name][collection_name], workers)
+    finally:
+        client.close()
+
+    tasks = [(mongo_uri, db_name, collection_name, row_source, format_row, low, high,
+              shard_path(output_file, index))
+             for index, (low, high) in enumerate(ranges)]
+    print(f"Exporting {len(tasks)} _id ranges with {len(tasks)} workers...")
+
+    total = 0
+    with multiprocessing.Pool(max(len(tasks), 1)) as pool:
+        for count in pool.imap_unordered(_export_range, tasks):
+            total += count
+            print(f"Exported {total} rows...")
+
+    if merge:
+        with open_output(output_file, compression) as out:
+            for task in tasks:
+                with open(task[-1], "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                os.remove(task[-1])
+    print(f"Exported {total} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return total
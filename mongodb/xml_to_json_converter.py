@@ -2,131 +2,366 @@
 """
 Convert BioC XML format to JSON format.
 Handles large files using streaming XML parsing.
+With --workers N the dump is split at <document> boundaries and the
+segments are converted by a process pool, then merged back in order.
+With --format jsonl one compact document is written per line instead of
+an indented JSON array. --parser selects the XML backend (see common/bioc_xml.py).
+With --columnar DIR the articles and citations tables are also written as
+Parquet while streaming (see common/columnar.py).
+Progress is checkpointed after every segment so --resume can pick up an
+interrupted run. --manifest records a content hash per document; with
+--previous-manifest only new or changed documents are written (a delta file).
+--pg-copy, --mongo-ndjson and --neo4j-csv write backend bulk-load files from
+the same parse, so the dump is only read once.
 """
 
+import argparse
+import hashlib
 import json
-import xml.etree.ElementTree as ET
+import multiprocessing
+import os
+import shutil
 import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from contextlib import ExitStack
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.bioc_xml import (  # noqa: E402
+    PARSER_BACKENDS,
+    SegmentReader,
+    find_document_segments,
+    iter_documents,
+)
+from common.articles import extract_article  # noqa: E402
+from common.bulk_formats import (  # noqa: E402
+    NEO4J_DOCUMENT_MARKER,
+    NEO4J_EDGES_FILE,
+    NEO4J_NODES_FILE,
+    Neo4jCsvMerger,
+    mongo_document,
+    neo4j_rows,
+    pg_copy_line,
+    write_neo4j_headers,
+)
+from common.columnar import ColumnarWriter, prepare_columnar_dir  # noqa: E402
+
+INPUT_FILE = Path('../data/basex/litcovid2BioCXML')
+OUTPUT_FILE = Path('../data/basex/litcovid2BioCJSON')
+# Size of the byte ranges handed to each worker process
+SEGMENT_SIZE = 64 * 1024 * 1024
+
+
+def format_json_element(doc):
+    """Serialize a document as an indented element of the output JSON array."""
+    doc_json = json.dumps(doc, ensure_ascii=False, indent=2)
+    # Indent each line of the document
+    return '\n'.join('  ' + line if line.strip() else line
+                     for line in doc_json.split('\n'))
+
+
+def format_json_line(doc):
+    """Serialize a document as one compact JSON Lines record."""
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':'))
+
+
+# Output layouts: (opening, separator between documents, closing, serializer)
+OUTPUT_FORMATS = {
+    'json': ('[\n', ',\n', '\n]', format_json_element),
+    'jsonl': ('', '\n', '\n', format_json_line),
+}
+
+
+def document_hash(doc_json):
+    """Content hash of a compact JSON document, used by the manifest to detect changes."""
+    return hashlib.blake2b(doc_json.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def load_manifest(path):
+    """Read a manifest written by --manifest into a {document id: hash} dictionary."""
+    hashes = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            doc_id, _, digest = line.rstrip('\n').partition('\t')
+            hashes[doc_id] = digest
+    return hashes
+
+
+# Hashes of the previous manifest, loaded once per process in delta mode
+_previous_hashes = None
+
+
+def init_worker(previous_manifest):
+    global _previous_hashes
+    if previous_manifest and _previous_hashes is None:
+        _previous_hashes = load_manifest(previous_manifest)
+
+
+def convert_segment(task):
+    """
+    Convert one byte range of the dump, in a worker process or inline.
+    Records are appended to the files in task['streams'], side outputs are
+    written as parts named task['part_name'].
+    Returns (documents parsed, documents written).
+    """
+    _, separator, _, serialize = OUTPUT_FORMATS[task['output_format']]
+    columnar = (ColumnarWriter(task['columnar_dir'], task['part_name'])
+                if task['columnar_dir'] else None)
+
+    parsed = written = 0
+    with ExitStack() as stack:
+        source = stack.enter_context(SegmentReader(task['input_file'], task['start'], task['end']))
+        files = {name: stack.enter_context(open(path, 'a', encoding='utf-8'))
+                 for name, path in task['streams'].items()}
+        f = files['output']
+        manifest = files.get('manifest')
+        pg_copy = files.get('pg_copy')
+        mongo = files.get('mongo')
+        neo4j_nodes = files.get('neo4j_nodes')
+        neo4j_edges = files.get('neo4j_edges')
+        needs_article = columnar or mongo or neo4j_nodes
+
+        for doc in iter_documents(source, task['backend']):
+            parsed += 1
+            doc_json = None
+            if manifest or _previous_hashes is not None:
+                doc_id = doc.get('id', '')
+                doc_json = format_json_line(doc)
+                digest = document_hash(doc_json)
+                if manifest:
+                    manifest.write(f"{doc_id}\t{digest}\n")
+                # Delta mode: skip documents that are unchanged since the previous run
+                if _previous_hashes is not None and doc_id \
+                        and _previous_hashes.get(doc_id) == digest:
+                    continue
+
+            if written or task['after_documents']:
+                f.write(separator)
+            f.write(serialize(doc))
+            written += 1
+
+            if pg_copy:
+                pg_copy.write(pg_copy_line(doc_json or format_json_line(doc)))
+            if needs_article:
+                article = extract_article(doc)
+                if columnar:
+                    columnar.add(article)
+                if mongo:
+                    mongo.write(format_json_line(mongo_document(doc, article)) + '\n')
+                if neo4j_nodes and article['pmid']:
+                    node, edges = neo4j_rows(article)
+                    neo4j_nodes.write(node)
+                    # Neo4j streams always go through merge-filtered part files
+                    neo4j_edges.write(NEO4J_DOCUMENT_MARKER + edges)
+
+    if columnar:
+        columnar.close()
+    return parsed, written
+
+
+def checkpoint_path(output_file):
+    return Path(f"{output_file}.checkpoint")
 
-def parse_infon(infon_elem):
-    """Parse an infon element and return key-value pair."""
-    key = infon_elem.get('key', '')
-    value = infon_elem.text if infon_elem.text else ''
-    return key, value
-
-
-def parse_passage(passage_elem):
-    """Parse a passage element and return a dictionary."""
-    passage = {}
-    infons = {}
-    offset = None
-    text = None
-    
-    for child in passage_elem:
-        if child.tag == 'infon':
-            key, value = parse_infon(child)
-            if key:
-                infons[key] = value
-        elif child.tag == 'offset':
-            offset = child.text if child.text else None
-        elif child.tag == 'text':
-            text = child.text if child.text else None
-    
-    if infons:
-        passage['infons'] = infons
-    if offset is not None:
-        # Try to convert offset to int, otherwise keep as string
-        try:
-            passage['offset'] = int(offset)
-        except (ValueError, AttributeError):
-            passage['offset'] = offset
-    if text is not None:
-        passage['text'] = text
-    
-    return passage
-
-
-def parse_document(doc_elem):
-    """Parse a document element and return a dictionary."""
-    doc = {}
-    doc_id = None
-    passages = []
-    
-    for child in doc_elem:
-        if child.tag == 'id':
-            doc_id = child.text if child.text else None
-        elif child.tag == 'passage':
-            passage = parse_passage(child)
-            if passage:
-                passages.append(passage)
-    
-    if doc_id:
-        doc['id'] = doc_id
-    if passages:
-        doc['passages'] = passages
-    
-    return doc
-
-
-def convert_xml_to_json(input_file, output_file):
+
+def save_checkpoint(output_file, state):
+    """Atomically record how far the conversion got."""
+    path = checkpoint_path(output_file)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(output_file, input_file, output_format, stream_files, columnar_dir):
+    """
+    Return the checkpoint of an interrupted run on the same input, with the
+    same output streams and columnar directory, or None.
+    """
+    path = checkpoint_path(output_file)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state['input_size'] != os.path.getsize(input_file) \
+            or state['output_format'] != output_format:
+        print(f"Ignoring {path}: it was written for a different input or format")
+        return None
+    if state.get('streams') != stream_files or state.get('columnar_dir') != columnar_dir:
+        # A stream added on resume would miss the first segments, a dropped one their last
+        print(f"Ignoring {path}: it was written with different output files "
+              f"(--manifest, --pg-copy, --mongo-ndjson, --neo4j-csv or --columnar)")
+        return None
+    return state
+
+
+def run_segments(tasks, stream_files, state, workers, separator, output_file,
+                 merge_filters=None):
+    """
+    Convert segments inline or in a process pool, append each segment's records
+    to the stream files in input order and checkpoint after every segment.
+    Streams listed in `merge_filters` always go through part files, and only
+    the lines their filter accepts are appended.
+    """
+    merge_filters = merge_filters or {}
+    part_dir = None
+    if workers > 1 or merge_filters:
+        part_dir = tempfile.mkdtemp(prefix='bioc-parts-', dir=Path(output_file).parent)
+        for task in tasks:
+            task['streams'] = {
+                name: (os.path.join(part_dir, f"{task['part_name']}.{name}")
+                       if workers > 1 or name in merge_filters else final_file)
+                for name, final_file in stream_files.items()
+            }
+
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=init_worker,
+                                    initargs=(state['previous_manifest'],))
+        # imap keeps segment order, so parts can be appended as they arrive
+        results = pool.imap(convert_segment, tasks)
+    else:
+        pool = None
+        init_worker(state['previous_manifest'])
+        results = map(convert_segment, tasks)
+
+    try:
+        for task in tasks:
+            if workers <= 1:
+                # Inline segments append straight to the main output
+                task['after_documents'] = state['written_count'] > 0
+            parsed, written = next(results)
+
+            for name, final_file in stream_files.items():
+                part_file = task['streams'][name]
+                if part_file == final_file:
+                    continue
+                with open(final_file, 'a', encoding='utf-8') as f:
+                    if name == 'output' and written and state['written_count']:
+                        f.write(separator)
+                    with open(part_file, 'r', encoding='utf-8') as part:
+                        if name in merge_filters:
+                            keep = merge_filters[name]
+                            f.writelines(line for line in part if keep(line))
+                        else:
+                            shutil.copyfileobj(part, f)
+                os.remove(part_file)
+
+            state['doc_count'] += parsed
+            state['written_count'] += written
+            state['byte_offset'] = task['end']
+            state['segments_done'] += 1
+            state['stream_sizes'] = {name: os.path.getsize(path)
+                                     for name, path in stream_files.items()}
+            save_checkpoint(output_file, state)
+            print(f"Processed {state['doc_count']} documents "
+                  f"({state['segments_done']} segments, offset {task['end']})...")
+    finally:
+        if pool:
+            pool.terminate()
+        if part_dir:
+            shutil.rmtree(part_dir, ignore_errors=True)
+
+
+def convert_xml_to_json(input_file, output_file, workers=1, segment_size=SEGMENT_SIZE,
+                        output_format='json', backend='etree', columnar_dir=None,
+                        resume=False, manifest_file=None, previous_manifest=None,
+                        pg_copy_file=None, mongo_file=None, neo4j_dir=None):
     """
     Convert BioC XML file to JSON format.
     Uses iterative parsing to handle large files efficiently.
+    Progress is checkpointed after each segment to <output>.checkpoint so an
+    interrupted run can continue with resume=True. With previous_manifest,
+    only documents that are new or changed since that manifest are written.
+    pg_copy_file, mongo_file and neo4j_dir add backend bulk-load files
+    written from the same parse (see common/bulk_formats.py).
     """
     print(f"Reading XML file: {input_file}")
     print(f"Output JSON file: {output_file}")
-    
-    doc_count = 0
-    
+    print(f"Parser backend: {backend}")
+
     try:
-        # Use iterparse for memory-efficient parsing
-        # We need to track the root element for cleanup
-        context = ET.iterparse(input_file, events=('start', 'end'))
-        context = iter(context)
-        event, root = next(context)
-        
-        # Open output file for writing
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('[\n')
-            first_doc = True
-            
-            for event, elem in context:
-                if event == 'end' and elem.tag == 'document':
-                    # Parse the complete document
-                    doc = parse_document(elem)
-                    if doc:
-                        # Write document to file incrementally
-                        if not first_doc:
-                            f.write(',\n')
-                        else:
-                            first_doc = False
-                        
-                        # Write with proper indentation for array elements
-                        doc_json = json.dumps(doc, ensure_ascii=False, indent=2)
-                        # Indent each line of the document
-                        indented = '\n'.join('  ' + line if line.strip() else line 
-                                            for line in doc_json.split('\n'))
-                        f.write(indented)
-                        doc_count += 1
-                        if doc_count % 100 == 0:
-                            print(f"Processed {doc_count} documents...")
-                    
-                    # Clear the element and its children to free memory
-                    elem.clear()
-                    # Clear root's children to free memory (keep only the last few)
-                    # This helps with memory management for large files
-                    if len(root) > 10:
-                        # Remove old children, keep recent ones
-                        for child in list(root)[:-5]:
-                            root.remove(child)
-            
-            f.write('\n]')
-        
+        stream_files = {'output': str(output_file)}
+        if manifest_file:
+            stream_files['manifest'] = str(manifest_file)
+        if pg_copy_file:
+            stream_files['pg_copy'] = str(pg_copy_file)
+        if mongo_file:
+            stream_files['mongo'] = str(mongo_file)
+        merge_filters = {}
+        if neo4j_dir:
+            write_neo4j_headers(neo4j_dir)
+            stream_files['neo4j_nodes'] = str(Path(neo4j_dir) / NEO4J_NODES_FILE)
+            stream_files['neo4j_edges'] = str(Path(neo4j_dir) / NEO4J_EDGES_FILE)
+            neo4j_merger = Neo4jCsvMerger()
+            # Nodes come before edges in stream_files, so each segment's
+            # node decisions are known when its edges are merged
+            merge_filters = {'neo4j_nodes': neo4j_merger.node_filter,
+                             'neo4j_edges': neo4j_merger.edge_filter}
+
+        opening, separator, closing, _ = OUTPUT_FORMATS[output_format]
+        columnar = columnar_dir and str(columnar_dir)
+        state = (load_checkpoint(output_file, input_file, output_format, stream_files, columnar)
+                 if resume else None)
+        if state:
+            print(f"Resuming after {state['doc_count']} documents at byte {state['byte_offset']}")
+            for name, path in stream_files.items():
+                with open(path, 'r+b') as f:
+                    f.truncate(state['stream_sizes'][name])
+            if neo4j_dir:
+                neo4j_merger.rebuild(stream_files['neo4j_nodes'], stream_files['neo4j_edges'])
+        else:
+            state = {
+                'input_file': str(input_file),
+                'input_size': os.path.getsize(input_file),
+                'output_format': output_format,
+                'previous_manifest': previous_manifest and str(previous_manifest),
+                'streams': stream_files,
+                'columnar_dir': columnar,
+                'byte_offset': 0,
+                'segments_done': 0,
+                'doc_count': 0,
+                'written_count': 0,
+            }
+            for name, path in stream_files.items():
+                with open(path, 'w', encoding='utf-8') as f:
+                    f.write(opening if name == 'output' else '')
+
+        segments = find_document_segments(input_file, segment_size, state['byte_offset'])
+        print(f"Split input into {len(segments)} segments for {workers} workers")
+        if columnar_dir:
+            prepare_columnar_dir(columnar_dir, state['segments_done'])
+            print(f"Columnar tables: {columnar_dir}")
+
+        tasks = [{
+            'input_file': str(input_file),
+            'start': start,
+            'end': end,
+            'streams': dict(stream_files),
+            'after_documents': False,
+            'part_name': f"part-{state['segments_done'] + i:05d}",
+            'output_format': output_format,
+            'backend': backend,
+            'columnar_dir': columnar,
+        } for i, (start, end) in enumerate(segments)]
+
+        run_segments(tasks, stream_files, state, workers, separator, output_file,
+                     merge_filters)
+
+        doc_count = state['doc_count']
+        if state['written_count'] or output_format == 'json':
+            with open(output_file, 'a', encoding='utf-8') as f:
+                f.write(closing)
+        if neo4j_dir:
+            ghosts = neo4j_merger.write_ghost_nodes(stream_files['neo4j_nodes'])
+            print(f"Neo4j import CSVs written to {neo4j_dir} ({ghosts} reference-only nodes)")
+        checkpoint_path(output_file).unlink(missing_ok=True)
+
         print(f"\nTotal documents parsed: {doc_count}")
-        print(f"Conversion complete! {doc_count} documents written to {output_file}")
-        
+        if state['previous_manifest']:
+            print(f"Delta: {state['written_count']} new or changed documents")
+        print(f"Conversion complete! {state['written_count']} documents written to {output_file}")
+
     except ET.ParseError as e:
         print(f"XML parsing error: {e}", file=sys.stderr)
         import traceback
@@ -140,16 +375,50 @@ def convert_xml_to_json(input_file, output_file):
 
 
 def main():
-    input_file = Path('../data/basex/litcovid2BioCXML')
-    output_file = Path('../data/basex/litcovid2BioCJSON')
-    
-    if not input_file.exists():
-        print(f"Error: Input file not found: {input_file}", file=sys.stderr)
+    parser = argparse.ArgumentParser(description="Convert a BioC XML dump to JSON.")
+    parser.add_argument('input_file', nargs='?', type=Path, default=INPUT_FILE)
+    parser.add_argument('output_file', nargs='?', type=Path, default=OUTPUT_FILE)
+    parser.add_argument('--workers', '-j', type=int, default=1,
+                        help="number of parser processes (0 = one per CPU core)")
+    parser.add_argument('--segment-mb', type=int, default=SEGMENT_SIZE // (1024 * 1024),
+                        help="size of the input segments handed to each worker, in MB")
+    parser.add_argument('--format', choices=sorted(OUTPUT_FORMATS), default='json',
+                        help="json: indented JSON array, jsonl: one compact document per line")
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default='etree',
+                        help="XML parser backend; expat skips annotations and relations")
+    parser.add_argument('--columnar', type=Path, metavar='DIR',
+                        help="also write articles/citations Parquet tables to DIR")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue an interrupted run from <output>.checkpoint")
+    parser.add_argument('--manifest', type=Path, metavar='FILE',
+                        help="write the id and content hash of every document to FILE")
+    parser.add_argument('--previous-manifest', type=Path, metavar='FILE',
+                        help="only write documents that are new or changed since FILE")
+    parser.add_argument('--pg-copy', type=Path, metavar='FILE',
+                        help="also write bioc_data rows in PostgreSQL COPY text format")
+    parser.add_argument('--mongo-ndjson', type=Path, metavar='FILE',
+                        help="also write JSON Lines with pmid/title/abstract/ref_pmids extracted")
+    parser.add_argument('--neo4j-csv', type=Path, metavar='DIR',
+                        help="also write neo4j-admin import CSVs for :Article and :CITES")
+    args = parser.parse_args()
+
+    if not args.input_file.exists():
+        print(f"Error: Input file not found: {args.input_file}", file=sys.stderr)
         sys.exit(1)
-    
-    convert_xml_to_json(input_file, output_file)
+
+    workers = args.workers or os.cpu_count()
+    convert_xml_to_json(args.input_file, args.output_file, workers,
+                        segment_size=args.segment_mb * 1024 * 1024,
+                        output_format=args.format,
+                        backend=args.parser,
+                        columnar_dir=args.columnar,
+                        resume=args.resume,
+                        manifest_file=args.manifest,
+                        previous_manifest=args.previous_manifest,
+                        pg_copy_file=args.pg_copy,
+                        mongo_file=args.mongo_ndjson,
+                        neo4j_dir=args.neo4j_csv)
 
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,142 @@
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from neo4j import GraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common import bioc_xml, ndjson  # noqa: E402
+from common.articles import extract_article  # noqa: E402
+from common.bulk_formats import (  # noqa: E402
+    NEO4J_EDGES_FILE,
+    NEO4J_EDGES_HEADER_FILE,
+    NEO4J_NODES_FILE,
+    NEO4J_NODES_HEADER_FILE,
+    Neo4jCsvMerger,
+    neo4j_rows,
+    write_neo4j_headers,
+)
+from load_to_neo4j import AUTH, URI, create_constraint  # noqa: E402
+
+# --- CONFIGURATION ---
+# The BioC XML dump, or the JSON / JSON Lines output of the converter
+FILE_PATH = '../data/neo4j/litcovid2BioCJSON-converted'
+CSV_DIR = '../data/neo4j/import'
+CONTAINER = "neo4j"
+IMAGE = "neo4j:latest"
+DATABASE = "neo4j"
+
+def is_xml(path):
+    with open(path, 'rb') as f:
+        return f.read(4096).lstrip().startswith(b'<')
+
+def stream_documents(path, parser_backend):
+    if is_xml(path):
+        return bioc_xml.iter_documents(path, parser_backend)
+    return ndjson.iter_documents(path)
+
+def write_import_csvs(path, csv_dir, parser_backend='expat'):
+    """
+    Stream the input once and write the neo4j-admin header and data CSVs.
+    Duplicate articles (and their relationships) are dropped with a compact
+    PMID bitmap, and every cited
+    PMID without a document of its own becomes a title-less :Article node.
+    """
+    csv_dir = Path(csv_dir)
+    write_neo4j_headers(csv_dir)
+    merger = Neo4jCsvMerger()
+    start_time = time.perf_counter()
+
+    count = 0
+    with open(csv_dir / NEO4J_NODES_FILE, 'w', encoding='utf-8') as nodes, \
+            open(csv_dir / NEO4J_EDGES_FILE, 'w', encoding='utf-8') as edges:
+        for doc in stream_documents(path, parser_backend):
+            article = extract_article(doc)
+            if not article['pmid']:
+                continue
+            node, edge_lines = neo4j_rows(article)
+            if merger.keep_node(node):
+                nodes.write(node)
+                for line in edge_lines.splitlines(keepends=True):
+                    merger.keep_edge(line)
+                edges.write(edge_lines)
+
+            count += 1
+            if count % 50000 == 0:
+                print(f"Written {count} articles...")
+
+    ghosts = merger.write_ghost_nodes(csv_dir / NEO4J_NODES_FILE)
+    duration = time.perf_counter() - start_time
+    print(f"CSVs written to {csv_dir}: {count} articles, {ghosts} reference-only nodes "
+          f"in {duration:.2f} seconds.")
+
+def run_admin_import(csv_dir, container=CONTAINER, image=IMAGE, database=DATABASE):
+    """
+    Stop the Neo4j container and rebuild its database offline with
+    neo4j-admin, using the container's own volumes, then start it again.
+    """
+    csv_dir = Path(csv_dir).resolve()
+    print(f"Stopping container {container}...")
+    subprocess.run(["docker", "stop", container], check=True)
+    try:
+        command = [
+            "docker", "run", "--rm",
+            "--volumes-from", container,
+            "-v", f"{csv_dir}:/import:ro",
+            image,
+            "neo4j-admin", "database", "import", "full",
+            f"--nodes=/import/{NEO4J_NODES_HEADER_FILE},/import/{NEO4J_NODES_FILE}",
+            f"--relationships=/import/{NEO4J_EDGES_HEADER_FILE},/import/{NEO4J_EDGES_FILE}",
+            "--overwrite-destination=true",
+            "--skip-duplicate-nodes=true",
+            "--skip-bad-relationships=true",
+            database,
+        ]
+        print("Running offline import:", " ".join(command))
+        subprocess.run(command, check=True)
+    finally:
+        print(f"Starting container {container}...")
+        subprocess.run(["docker", "start", container], check=True)
+
+def wait_and_create_constraint(timeout=120):
+    # The constraint is not part of the import, so add it once the server is back
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                driver.verify_connectivity()
+                break
+            except Exception:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(2)
+        create_constraint(driver)
+    finally:
+        driver.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Full rebuild of the citation graph with neo4j-admin database import.")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--csv-dir", default=CSV_DIR)
+    parser.add_argument("--skip-csv", action="store_true",
+                        help="reuse CSVs already in --csv-dir (e.g. from the converter's --neo4j-csv)")
+    parser.add_argument("--csv-only", action="store_true",
+                        help="write the CSVs without touching the container")
+    parser.add_argument("--parser", choices=sorted(bioc_xml.PARSER_BACKENDS), default="expat",
+                        help="XML parser backend when the input is the BioC XML dump")
+    parser.add_argument("--container", default=CONTAINER)
+    parser.add_argument("--image", default=IMAGE)
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+    if not args.skip_csv:
+        write_import_csvs(args.file_path, args.csv_dir, args.parser)
+    if not args.csv_only:
+        run_admin_import(args.csv_dir, args.container, args.image)
+        wait_and_create_constraint()
+    print(f"DONE in {time.perf_counter() - start_time:.2f} seconds.")
@@ -0,0 +1,65 @@
+import argparse
+import sys
+from pathlib import Path
+
+from neo4j import GraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
+# --- CONFIGURATION ---
+URI = "bolt://localhost:7687"
+AUTH = ("neo4j", "password")
+DATA_OUTPUT_FILE = "neo4j-results.txt"
+REFS_OUTPUT_FILE = "Result2.txt"
+
+def export_all(compression=None):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    with driver.session() as session:
+        print(f"Exporting {DATA_OUTPUT_FILE} and {REFS_OUTPUT_FILE} in a single pass...")
+
+        # One scan of the articles: the pattern comprehension collects the
+        # citations of each node as it is read, so no grouping stage is needed.
+        # We filter out nodes that don't have a title (the "ghost" nodes)
+        query = """
+        MATCH (a:Article)
+        WHERE a.title IS NOT NULL AND a.title <> ""
+        RETURN a.pmid AS pmid, a.title AS title, a.abstract AS abstract,
+               [(a)-[:CITES]->(r:Article) | r.pmid] AS cited_list
+        """
+
+        with open_output(DATA_OUTPUT_FILE, compression) as data_file, \
+                open_output(REFS_OUTPUT_FILE, compression) as refs_file:
+            results = session.run(query)
+            count = 0
+            refs_count = 0
+
+            for record in results:
+                pmid = record["pmid"]
+
+                # Format: PMID/Title Abstract
+                data_file.write(f"{pmid}/{record['title']} {record['abstract']}\n")
+                count += 1
+
+                # Format: PMID/Ref1/Ref2/Ref3...
+                cited_list = record["cited_list"]
+                if cited_list:
+                    citations = "/".join(str(c) for c in cited_list)
+                    refs_file.write(f"{pmid}/{citations}\n")
+                    refs_count += 1
+
+                if count % 5000 == 0:
+                    print(f"Processed {count} articles...")
+
+        print(f"SUCCESS: Exported {count} articles to {DATA_OUTPUT_FILE} "
+              f"and {refs_count} citation rows to {REFS_OUTPUT_FILE}")
+
+    driver.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Result 1 and Result 2 from Neo4j in one pass.")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write both outputs compressed in parallel blocks")
+    args = parser.parse_args()
+    export_all(args.compress)
@@ -0,0 +1,51 @@
+import argparse
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+from neo4j import AsyncGraphDatabase
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.async_export import BATCH_SIZE, QUEUE_SIZE, run_export  # noqa: E402
+from common.output_sink import COMPRESSIONS  # noqa: E402
+
+# --- CONFIGURATION ---
+# Queries, formatting, connection settings and output files are those of the
+# synchronous exporters, so both produce the same files
+EXPORTERS = {"data": "export-data", "refs": "export-refs"}
+FETCH_SIZE = 2000
+
+async def fetch_records(exporter, fetch_size):
+    driver = AsyncGraphDatabase.driver(exporter.URI, auth=exporter.AUTH)
+    try:
+        async with driver.session(fetch_size=fetch_size) as session:
+            result = await session.run(exporter.QUERY)
+            async for record in result:
+                yield record
+    finally:
+        await driver.close()
+
+def export_async(task, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE, fetch_size=FETCH_SIZE,
+                 compression=None):
+    exporter = importlib.import_module(EXPORTERS[task])
+    print(f"Exporting {task} to {exporter.OUTPUT_FILE} with the async driver...")
+    records = fetch_records(exporter, fetch_size)
+    count = asyncio.run(run_export(records, exporter.format_record, exporter.OUTPUT_FILE,
+                                   batch_size, queue_size, compression=compression))
+    print(f"SUCCESS: Exported {count} lines.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export Result 1 or Result 2 from Neo4j with overlapping fetch, format and write.")
+    parser.add_argument("task", choices=sorted(EXPORTERS))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="batches buffered between two stages")
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE,
+                        help="records pulled per round trip")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    export_async(args.task, args.batch_size, args.queue_size, args.fetch_size, args.compress)
@@ -1,25 +1,69 @@
+import argparse
+import sys
+from pathlib import Path
+
 from neo4j import GraphDatabase
 
+from incremental_export import export_incremental
+from paged_export import FETCH_SIZE, PAGE_SIZE, WORKERS, export_paged
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 URI = "bolt://localhost:7687"
 AUTH = ("neo4j", "password")
 OUTPUT_FILE = "neo4j-results.txt"
 
-def export_result_1():
+# Cypher query to fetch PMID, Title, and Abstract
+# We filter out nodes that don't have a title (the "ghost" nodes)
+QUERY = """
+MATCH (a:Article)
+WHERE a.title IS NOT NULL AND a.title <> ""
+RETURN a.pmid AS pmid, a.title AS title, a.abstract AS abstract
+"""
+
+# Paged mode (--paged): one pmid range per query, see paged_export.py;
+# incremental mode (--incremental): the load batches past the watermark
+PAGE_QUERY = """
+MATCH (a:Article)
+WHERE {range} AND a.title IS NOT NULL AND a.title <> ""
+RETURN a.pmid AS pmid, a.title AS title, a.abstract AS abstract
+ORDER BY a.pmid
+"""
+
+def format_record(record):
+    # Format: PMID/Title Abstract
+    return f"{record['pmid']}/{record['title']} {record['abstract']}\n"
+
+def export_result_1_paged(page_size=PAGE_SIZE, fetch_size=FETCH_SIZE, workers=WORKERS,
+                          compression=None):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        print(f"Exporting data to {OUTPUT_FILE} in pages...")
+        count = export_paged(driver, PAGE_QUERY, OUTPUT_FILE, format_record,
+                             page_size, fetch_size, workers, compression)
+        print(f"SUCCESS: Exported {count} articles to {OUTPUT_FILE}")
+    finally:
+        driver.close()
+
+def export_result_1_incremental(compression=None):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        print(f"Exporting new articles to {OUTPUT_FILE}...")
+        count = export_incremental(driver, PAGE_QUERY, OUTPUT_FILE, format_record, compression)
+        print(f"SUCCESS: Exported {count} articles to {OUTPUT_FILE}")
+    finally:
+        driver.close()
+
+def export_result_1(compression=None):
     driver = GraphDatabase.driver(URI, auth=AUTH)
     with driver.session() as session:
         print(f"Exporting data to {OUTPUT_FILE}...")
         
-        # Cypher query to fetch PMID, Title, and Abstract
-        # We filter out nodes that don't have a title (the "ghost" nodes)
-        query = """
-        MATCH (a:Article)
-        WHERE a.title IS NOT NULL AND a.title <> ""
-        RETURN a.pmid AS pmid, a.title AS title, a.abstract AS abstract
-        """
-        
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            results = session.run(query)
+        with open_output(OUTPUT_FILE, compression) as f:
+            results = session.run(QUERY)
             count = 0
             
             for record in results:
@@ -40,4 +84,21 @@ def export_result_1():
     driver.close()
 
 if __name__ == "__main__":
-    export_result_1()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 1 from Neo4j.")
+    parser.add_argument("--paged", action="store_true",
+                        help="keyset pages over the pmid index, fetched concurrently")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="concurrent sessions in paged mode")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the articles loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    if args.incremental:
+        export_result_1_incremental(args.compress)
+    elif args.paged:
+        export_result_1_paged(args.page_size, args.fetch_size, args.workers, args.compress)
+    else:
+        export_result_1(args.compress)
\ No newline at end of file
@@ -1,25 +1,73 @@
+import argparse
+import sys
+from pathlib import Path
+
 from neo4j import GraphDatabase
 
+from incremental_export import export_incremental
+from paged_export import FETCH_SIZE, PAGE_SIZE, WORKERS, export_paged
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 URI = "bolt://localhost:7687"
 AUTH = ("neo4j", "password")
 OUTPUT_FILE = "Result2.txt"
 
-def export_refs():
+# We use collect(r.pmid) to group all citations for one article into a list
+QUERY = """
+MATCH (a:Article)-[:CITES]->(r:Article)
+WHERE a.title IS NOT NULL AND a.title <> ""
+RETURN a.pmid AS source_pmid, collect(r.pmid) AS cited_list
+"""
+
+# Paged mode (--paged): the citations of each article are collected by a
+# pattern comprehension while its page streams, instead of one global collect().
+# Incremental mode (--incremental) runs it on the load batches past the watermark
+PAGE_QUERY = """
+MATCH (a:Article)
+WHERE {range} AND a.title IS NOT NULL AND a.title <> ""
+WITH a ORDER BY a.pmid
+WITH a, [(a)-[:CITES]->(r:Article) | r.pmid] AS cited_list
+WHERE size(cited_list) > 0
+RETURN a.pmid AS source_pmid, cited_list
+"""
+
+def format_record(record):
+    # Format: PMID/Ref1/Ref2/Ref3...
+    citations = "/".join(str(c) for c in record["cited_list"])
+    return f"{record['source_pmid']}/{citations}\n"
+
+def export_refs_paged(page_size=PAGE_SIZE, fetch_size=FETCH_SIZE, workers=WORKERS,
+                      compression=None):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        print(f"Generating {OUTPUT_FILE} from Neo4j in pages...")
+        count = export_paged(driver, PAGE_QUERY, OUTPUT_FILE, format_record,
+                             page_size, fetch_size, workers, compression)
+        print(f"SUCCESS: Created {OUTPUT_FILE} with {count} source articles.")
+    finally:
+        driver.close()
+
+def export_refs_incremental(compression=None):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        print(f"Appending new articles to {OUTPUT_FILE} from Neo4j...")
+        count = export_incremental(driver, PAGE_QUERY, OUTPUT_FILE, format_record, compression)
+        print(f"SUCCESS: Added {count} source articles to {OUTPUT_FILE}.")
+    finally:
+        driver.close()
+
+def export_refs(compression=None):
     driver = GraphDatabase.driver(URI, auth=AUTH)
     with driver.session() as session:
         print(f"Generating {OUTPUT_FILE} from Neo4j...")
         
-        # We use collect(r.pmid) to group all citations for one article into a list
-        query = """
-        MATCH (a:Article)-[:CITES]->(r:Article)
-        WHERE a.title IS NOT NULL AND a.title <> ""
-        RETURN a.pmid AS source_pmid, collect(r.pmid) AS cited_list
-        """
-        
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        with open_output(OUTPUT_FILE, compression) as f:
             # We use a result buffer (streaming)
-            results = session.run(query)
+            results = session.run(QUERY)
             count = 0
             
             for record in results:
@@ -42,4 +90,21 @@ def export_refs():
     driver.close()
 
 if __name__ == "__main__":
-    export_refs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 2 from Neo4j.")
+    parser.add_argument("--paged", action="store_true",
+                        help="keyset pages over the pmid index, fetched concurrently")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--fetch-size", type=int, default=FETCH_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="concurrent sessions in paged mode")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the articles loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    if args.incremental:
+        export_refs_incremental(args.compress)
+    elif args.paged:
+        export_refs_paged(args.page_size, args.fetch_size, args.workers, args.compress)
+    else:
+        export_refs(args.compress)
\ No newline at end of file
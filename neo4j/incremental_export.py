@@ -0,0 +1,65 @@
+"""
+Incremental export of :Article nodes.
+The watermark is the load_batch property load_to_neo4j.py sets on the
+articles it writes (the start time of that load). Only the articles of the
+loads after the previous incremental export, up to the current highest batch,
+are exported and appended to the output file; without a valid watermark every
+article is exported and the file rewritten. Nodes written by the offline bulk
+import have no load_batch and count as already exported.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output, output_path  # noqa: E402
+from common.watermark import load_watermark, save_watermark  # noqa: E402
+
+HIGH_QUERY = "MATCH (a:Article) RETURN max(a.load_batch) AS high"
+
+
+def _incremental_query(page_query, after):
+    # `{range}` in the query becomes the load_batch range past the watermark
+    if after is None:
+        key_range = "(a.load_batch IS NULL OR a.load_batch <= $high)"
+    else:
+        key_range = "a.load_batch > $after AND a.load_batch <= $high"
+    return page_query.replace("{range}", key_range)
+
+
+def export_incremental(driver, page_query, output_file, format_record, compression=None):
+    """
+    Run `page_query` on the articles past the watermark of `output_file` and
+    append the lines to it. `format_record` turns a record into an output
+    line, or None to skip it.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    path = output_path(output_file, compression)
+    after = load_watermark(path)
+
+    with driver.session() as session:
+        high = session.run(HIGH_QUERY).single()["high"]
+        if high is None and after is None:
+            # Nothing loaded by load_to_neo4j.py yet: every node is before the first batch
+            high = 0
+        elif high is None or (after is not None and high <= after):
+            print(f"Nothing to export: no articles past load batch {after}.")
+            return 0
+        print(f"Exporting articles up to load batch {high} "
+              f"({'appending' if after is not None else 'full export'})...")
+
+        count = 0
+        with open_output(output_file, compression, append=after is not None) as f:
+            result = session.run(_incremental_query(page_query, after), after=after, high=high)
+            for record in result:
+                line = format_record(record)
+                if line is not None:
+                    f.write(line)
+                    count += 1
+
+    save_watermark(path, high)
+    print(f"Exported {count} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return count
@@ -1,48 +1,91 @@
-import ijson
-import json
+import argparse
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
 from neo4j import GraphDatabase
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.bulk_formats import PmidSet  # noqa: E402
+from common.ndjson import iter_documents  # noqa: E402
+
 # --- CONFIGURATION ---
 URI = "bolt://localhost:7687"
 AUTH = ("neo4j", "password")
+# Either the JSON array or the JSON Lines output of the converter
 FILE_PATH = '../data/neo4j/litcovid2BioCJSON-converted'
 
-def stream_json(path):
-    with open(path, 'rb') as f:
-        for obj in ijson.items(f, 'item'):
-            yield obj
+# --- BATCHED MODE (--batched) ---
+BATCH_SIZE = 5000
+WORKERS = 4
+# The relationship phase splits the pmids into WORKERS * EDGE_BUCKETS_PER_WORKER
+# buckets, so that concurrent transactions never touch the same node
+EDGE_BUCKETS_PER_WORKER = 2
+
+CONSTRAINT = """
+CREATE CONSTRAINT article_pmid IF NOT EXISTS
+FOR (a:Article) REQUIRE a.pmid IS UNIQUE
+"""
+
+# Every article gets the start time of the load that first wrote it as
+# load_batch; the incremental exports (--incremental) use it as their watermark
+LOAD_BATCH_INDEX = """
+CREATE INDEX article_load_batch IF NOT EXISTS
+FOR (a:Article) ON (a.load_batch)
+"""
+
+def stream_json(path, start=0, end=None):
+    yield from iter_documents(path, start, end)
+
+def extract_fields(doc):
+    """Return (pmid, title, abstract, refs) of a document; pmid is None when missing."""
+    pmid = None
+    title = ""
+    abstract_parts = []
+    refs = []
+
+    # --- EXTRACTION WITH SAFETY ---
+    for p in doc.get('passages', []):
+        infons = p.get('infons', {})
+
+        # Check for PMID in this passage
+        if not pmid:
+            pmid = infons.get('article-id_pmid')
+
+        if infons.get('section_type') == 'TITLE':
+            title = p.get('text', '')
+
+        if infons.get('section_type') == 'ABSTRACT' and infons.get('type') == 'abstract':
+            abstract_parts.append(p.get('text', ''))
 
-def import_to_neo4j():
+        if infons.get('section_type') == 'REF':
+            ref_id = infons.get('pub-id_pmid')
+            if ref_id:
+                refs.append(ref_id)
+
+    return pmid, title, " ".join(abstract_parts), refs
+
+def create_constraint(driver):
+    # Without it every MERGE on :Article {pmid} is a label scan
+    with driver.session() as session:
+        session.run(CONSTRAINT).consume()
+        session.run(LOAD_BATCH_INDEX).consume()
+
+def import_to_neo4j(path=FILE_PATH):
     driver = GraphDatabase.driver(URI, auth=AUTH)
+    create_constraint(driver)
+    load_batch = int(time.time())
     with driver.session() as session:
         print("Starting Neo4j Import (with Null Guards)...")
-        
+
         count = 0
         skipped = 0
-        for doc in stream_json(FILE_PATH):
-            pmid = None
-            title = ""
-            abstract_parts = []
-            refs = []
-
-            # --- EXTRACTION WITH SAFETY ---
-            for p in doc.get('passages', []):
-                infons = p.get('infons', {})
-                
-                # Check for PMID in this passage
-                if not pmid:
-                    pmid = infons.get('article-id_pmid')
-                
-                if infons.get('section_type') == 'TITLE':
-                    title = p.get('text', '')
-                
-                if infons.get('section_type') == 'ABSTRACT' and infons.get('type') == 'abstract':
-                    abstract_parts.append(p.get('text', ''))
-                
-                if infons.get('section_type') == 'REF':
-                    ref_id = infons.get('pub-id_pmid')
-                    if ref_id: 
-                        refs.append(ref_id)
+        for doc in stream_json(path):
+            pmid, title, full_abstract, refs = extract_fields(doc)
 
             # --- THE NULL GUARD ---
             if not pmid:
@@ -50,21 +93,26 @@ def import_to_neo4j():
                 # print(f"Skipping document with no PMID")
                 continue # Skip this object (likely the legal notice or bad data)
 
-            full_abstract = " ".join(abstract_parts)
-
+            # The citations of an article loaded again (a delta) are replaced:
+            # MERGE alone would keep the references it no longer has
             cypher = """
             MERGE (a:Article {pmid: $pmid})
-            SET a.title = $title, a.abstract = $abstract
+            SET a.title = $title, a.abstract = $abstract,
+                a.load_batch = coalesce(a.load_batch, $load_batch)
             WITH a
+            OPTIONAL MATCH (a)-[old:CITES]->()
+            DELETE old
+            WITH DISTINCT a
             UNWIND $refs AS ref_pmid
             // Pass variables to a WITH clause to enable the WHERE filter
-            WITH a, ref_pmid 
+            WITH a, ref_pmid
             WHERE ref_pmid IS NOT NULL AND ref_pmid <> ""
             MERGE (target:Article {pmid: ref_pmid})
             MERGE (a)-[:CITES]->(target)
             """
             try:
-                session.run(cypher, pmid=pmid, title=title, abstract=full_abstract, refs=refs)
+                session.run(cypher, pmid=pmid, title=title, abstract=full_abstract, refs=refs,
+                            load_batch=load_batch)
                 count += 1
                 if count % 100 == 0:
                     print(f"Imported: {count} | Skipped: {skipped}...")
@@ -74,5 +122,185 @@ def import_to_neo4j():
     driver.close()
     print(f"DONE! Final Count: {count} | Total Skipped: {skipped}")
 
+# --- BATCHED IMPORT ---
+# Phase 1 writes the article nodes, phase 2 the reference-only ("ghost") nodes
+# and phase 3 the relationships between nodes that all exist by then.
+# Phase 1 also deletes the citations of articles already in the graph, so a
+# delta replaces them instead of only adding the new ones.
+NODES_QUERY = """
+UNWIND $rows AS row
+MERGE (a:Article {pmid: row.pmid})
+SET a.title = row.title, a.abstract = row.abstract,
+    a.load_batch = coalesce(a.load_batch, row.load_batch)
+WITH a
+OPTIONAL MATCH (a)-[old:CITES]->()
+DELETE old
+"""
+
+GHOSTS_QUERY = """
+UNWIND $rows AS pmid
+MERGE (:Article {pmid: pmid})
+"""
+
+EDGES_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Article {pmid: row.source})
+MATCH (r:Article {pmid: row.ref})
+MERGE (a)-[:CITES]->(r)
+"""
+
+def batches(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def write_batch(driver, query, rows):
+    # One explicit transaction per batch; transient errors (lock timeouts) are retried
+    with driver.session() as session:
+        session.execute_write(lambda tx: tx.run(query, rows=rows).consume())
+    return len(rows)
+
+def run_batches(driver, query, rows, batch_size, workers, label):
+    """Write the rows in UNWIND batches, with up to `workers` transactions in flight."""
+    start_time = time.perf_counter()
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for batch in batches(rows, batch_size):
+            pending.add(pool.submit(write_batch, driver, query, batch))
+            if len(pending) >= workers * 2:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    total += future.result()
+                rate = total / (time.perf_counter() - start_time)
+                print(f"{label}: {total} written ({rate:.0f}/s)...")
+        for future in pending:
+            total += future.result()
+    print(f"{label}: {total} written in {time.perf_counter() - start_time:.2f} seconds.")
+    return total
+
+def node_bucket(pmid, buckets):
+    return zlib.crc32(pmid.encode('utf-8')) % buckets
+
+def edge_rounds(buckets):
+    """
+    Return rounds of lanes; a lane is a list of (source bucket, ref bucket)
+    cells. The lanes of a round touch disjoint node buckets: first every
+    (i, i) cell, then the pairs of a round-robin tournament between buckets,
+    both directions of a pair in the same lane.
+    """
+    rounds = [[[(i, i)] for i in range(buckets)]]
+    players = list(range(buckets)) + ([None] if buckets % 2 else [])
+    for _ in range(len(players) - 1):
+        pairs = zip(players[:len(players) // 2], reversed(players[len(players) // 2:]))
+        rounds.append([[(i, j), (j, i)] for i, j in pairs if i is not None and j is not None])
+        # Circle method: the first player stays, the others rotate
+        players = [players[0], players[-1], *players[1:-1]]
+    return rounds
+
+def run_edge_batches(driver, rows, batch_size, workers, label):
+    """
+    Write CITES relationship rows in UNWIND batches, with up to `workers`
+    transactions in flight that share no node. MERGE locks both ends of a
+    relationship, so batches citing the same popular pmids would deadlock:
+    the rows are spilled to one file per (source bucket, ref bucket) cell,
+    then written in the rounds of edge_rounds().
+    """
+    if workers <= 1:
+        return run_batches(driver, EDGES_QUERY, rows, batch_size, 1, label)
+
+    start_time = time.perf_counter()
+    buckets = workers * EDGE_BUCKETS_PER_WORKER
+    with tempfile.TemporaryDirectory(prefix='neo4j-edges-') as tmp_dir:
+        def cell_path(cell):
+            return Path(tmp_dir) / f"{cell[0]}-{cell[1]}.tsv"
+
+        files = {}
+        try:
+            for row in rows:
+                cell = (node_bucket(row["source"], buckets), node_bucket(row["ref"], buckets))
+                if cell not in files:
+                    files[cell] = open(cell_path(cell), 'w', encoding='utf-8')
+                files[cell].write(f"{row['source']}\t{row['ref']}\n")
+        finally:
+            for f in files.values():
+                f.close()
+
+        def cell_rows(cell):
+            if cell in files:
+                with open(cell_path(cell), 'r', encoding='utf-8') as f:
+                    for line in f:
+                        source, ref = line.rstrip('\n').split('\t')
+                        yield {"source": source, "ref": ref}
+
+        def write_lane(lane):
+            return sum(write_batch(driver, EDGES_QUERY, batch)
+                       for cell in lane for batch in batches(cell_rows(cell), batch_size))
+
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for lanes in edge_rounds(buckets):
+                total += sum(pool.map(write_lane, lanes))
+                rate = total / (time.perf_counter() - start_time)
+                print(f"{label}: {total} written ({rate:.0f}/s)...")
+    print(f"{label}: {total} written in {time.perf_counter() - start_time:.2f} seconds.")
+    return total
+
+def import_batched(path=FILE_PATH, batch_size=BATCH_SIZE, workers=WORKERS):
+    driver = GraphDatabase.driver(URI, auth=AUTH)
+    try:
+        create_constraint(driver)
+        print(f"Starting batched Neo4j import ({batch_size} rows per transaction, {workers} workers)...")
+
+        load_batch = int(time.time())
+        articles = PmidSet()
+        cited = PmidSet()
+
+        def node_rows():
+            for doc in stream_json(path):
+                pmid, title, abstract, refs = extract_fields(doc)
+                if not pmid:
+                    continue
+                articles.add(pmid)
+                for ref_pmid in refs:
+                    cited.add(ref_pmid)
+                yield {"pmid": pmid, "title": title, "abstract": abstract, "load_batch": load_batch}
+
+        def ghost_rows():
+            for pmid in cited:
+                if pmid not in articles:
+                    yield pmid
+
+        def edge_rows():
+            for doc in stream_json(path):
+                pmid, _, _, refs = extract_fields(doc)
+                if pmid:
+                    for ref_pmid in refs:
+                        yield {"source": pmid, "ref": ref_pmid}
+
+        run_batches(driver, NODES_QUERY, node_rows(), batch_size, workers, "Articles")
+        run_batches(driver, GHOSTS_QUERY, ghost_rows(), batch_size, workers, "Reference-only nodes")
+        run_edge_batches(driver, edge_rows(), batch_size, workers, "CITES relationships")
+    finally:
+        driver.close()
+    print("DONE!")
+
 if __name__ == "__main__":
-    import_to_neo4j()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load converted BioC JSON into Neo4j.")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--batched", action="store_true",
+                        help="UNWIND batches in separate node and relationship phases")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="concurrent batch transactions in batched mode")
+    args = parser.parse_args()
+
+    if args.batched:
+        import_batched(args.file_path, args.batch_size, args.workers)
+    else:
+        import_to_neo4j(args.file_path)
@@ -0,0 +1,88 @@
+"""
+Keyset-paged export of :Article nodes.
+A first index-only pass over the ordered pmid values picks one boundary every
+`page_size` nodes; the pages [low, high) are then fetched concurrently over
+several sessions, each with an index range seek, and written in pmid order.
+Only a few pages are in flight at once, so neither the server nor the client
+holds the whole result.
+"""
+
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output  # noqa: E402
+
+PAGE_SIZE = 10000
+FETCH_SIZE = 2000
+WORKERS = 4
+
+BOUNDS_QUERY = """
+MATCH (a:Article)
+WHERE a.pmid IS NOT NULL
+RETURN a.pmid AS pmid
+ORDER BY a.pmid
+"""
+
+
+def page_bounds(driver, page_size=PAGE_SIZE, fetch_size=FETCH_SIZE):
+    """Return the (low, high) pmid bounds of every page; high is None on the last one."""
+    lows = []
+    with driver.session(fetch_size=fetch_size) as session:
+        for index, record in enumerate(session.run(BOUNDS_QUERY)):
+            if index % page_size == 0:
+                lows.append(record["pmid"])
+    return list(zip(lows, lows[1:] + [None]))
+
+
+def _page_query(page_query, high):
+    # `{range}` in the query becomes the key range of the page
+    key_range = "a.pmid >= $low" + (" AND a.pmid < $high" if high is not None else "")
+    return page_query.replace("{range}", key_range)
+
+
+def _fetch_page(driver, page_query, low, high, fetch_size, format_record):
+    with driver.session(fetch_size=fetch_size) as session:
+        result = session.run(_page_query(page_query, high), low=low, high=high)
+        lines = (format_record(record) for record in result)
+        return [line for line in lines if line is not None]
+
+
+def export_paged(driver, page_query, output_file, format_record,
+                 page_size=PAGE_SIZE, fetch_size=FETCH_SIZE, workers=WORKERS, compression=None):
+    """
+    Write the records of `page_query` for every page to `output_file`.
+    `format_record` turns a record into an output line, or None to skip it.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    bounds = page_bounds(driver, page_size, fetch_size)
+    print(f"Fetching {len(bounds)} pages of {page_size} nodes with {workers} sessions...")
+
+    count = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool, \
+            open_output(output_file, compression) as f:
+        pending = deque()
+
+        def write_next():
+            nonlocal count
+            lines = pending.popleft().result()
+            f.writelines(lines)
+            count += len(lines)
+
+        for low, high in bounds:
+            pending.append(pool.submit(_fetch_page, driver, page_query, low, high,
+                                       fetch_size, format_record))
+            # Pages are written in order while the next ones are being fetched
+            if len(pending) >= workers * 2:
+                write_next()
+                print(f"Processed {count} lines...")
+        while pending:
+            write_next()
+
+    print(f"Exported {count} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return count
@@ -0,0 +1,37 @@
+import sys
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.articles import format_data_line  # noqa: E402
+from common.columnar import part_files  # noqa: E402
+
+# --- CONFIGURATION ---
+# Written by: xml_to_json_converter.py --columnar ../data/columnar
+COLUMNAR_DIR = "../data/columnar"
+OUTPUT_FILE = "./parquet-data.txt"
+
+def export_parquet_data():
+    print(f"Exporting Result 1 from {COLUMNAR_DIR}/articles to {OUTPUT_FILE}...")
+    start_time = time.perf_counter()
+
+    count = 0
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        # Part files are read in conversion order, so the output follows the dump
+        for part in part_files(COLUMNAR_DIR, "articles"):
+            for batch in pq.ParquetFile(part).iter_batches(batch_size=65536):
+                columns = batch.to_pydict()
+                for pmid, title, abstract in zip(columns["pmid"], columns["title"],
+                                                 columns["abstract"]):
+                    f.write(format_data_line(pmid, title, abstract))
+                count += batch.num_rows
+                print(f"Processed {count} articles...")
+
+    duration = time.perf_counter() - start_time
+    print(f"SUCCESS: Exported {count} lines in {duration:.2f} seconds.")
+
+if __name__ == "__main__":
+    export_parquet_data()
@@ -0,0 +1,53 @@
+import sys
+import time
+from pathlib import Path
+
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.articles import format_refs_line  # noqa: E402
+from common.columnar import part_files  # noqa: E402
+
+# --- CONFIGURATION ---
+# Written by: xml_to_json_converter.py --columnar ../data/columnar
+COLUMNAR_DIR = "../data/columnar"
+OUTPUT_FILE = "./parquet-refs.txt"
+
+def export_parquet_refs():
+    print(f"Exporting Result 2 from {COLUMNAR_DIR}/citations to {OUTPUT_FILE}...")
+    start_time = time.perf_counter()
+
+    count = 0
+    source = None
+    article = None
+    refs = []
+    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        # Edges of one article are stored contiguously, so grouping consecutive
+        # rows by article (part and doc row, not pmid: two adjacent articles
+        # may share one) rebuilds each citation list without sorting
+        for index, part in enumerate(part_files(COLUMNAR_DIR, "citations")):
+            for batch in pq.ParquetFile(part).iter_batches(batch_size=65536):
+                columns = batch.to_pydict()
+                for source_pmid, ref_pmid, doc in zip(columns["source_pmid"], columns["ref_pmid"],
+                                                      columns["doc"]):
+                    if (index, doc) != article:
+                        if refs:
+                            f.write(format_refs_line(source, refs))
+                            count += 1
+                            if count % 100000 == 0:
+                                print(f"Exported {count} citation rows...")
+                        article = (index, doc)
+                        source = source_pmid
+                        refs = []
+                    refs.append(ref_pmid)
+
+        if refs:
+            f.write(format_refs_line(source, refs))
+            count += 1
+
+    duration = time.perf_counter() - start_time
+    print(f"SUCCESS: Exported {count} citation rows in {duration:.2f} seconds.")
+
+if __name__ == "__main__":
+    export_parquet_refs()
@@ -1,72 +1,578 @@
-import time
+import argparse
+import json
+import math
+import os
+import platform
+import shlex
+import statistics
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
 import matplotlib.pyplot as plt
 import numpy as np
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_input  # noqa: E402
+
 # Configuration: Folder names and script types
-databases = ['psql', 'mongodb', 'neo4j', 'basex']
+# 'parquet' reads the converter's columnar tables: a no-database baseline
+databases = ['psql', 'mongodb', 'neo4j', 'basex', 'parquet']
 tasks = ['data', 'refs']
-db_display_names = ['PostgreSQL', 'MongoDB', 'Neo4j', 'BaseX']
+db_display_names = ['PostgreSQL', 'MongoDB', 'Neo4j', 'BaseX', 'Parquet']
+
+# File written by each export script in the current folder; its lines and
+# bytes give the throughput, and a run that leaves no file counts as failed
+OUTPUT_FILES = {
+    'psql': {'data': 'postgres-data.txt', 'refs': 'postgres-refs.txt'},
+    'mongodb': {'data': 'mongo_result1.txt', 'refs': 'mongo-refs.txt'},
+    'neo4j': {'data': 'neo4j-results.txt', 'refs': 'Result2.txt'},
+    'basex': {'data': 'basex_result1.txt', 'refs': 'basex_result2.txt'},
+    'parquet': {'data': 'parquet-data.txt', 'refs': 'parquet-refs.txt'},
+}
+REPEAT = 5
+WARMUP = 1
+# Recorded with every run, so results on different data are not compared
+DATASET_FILE = '../data/basex/litcovid2BioCXML'
+CONTAINERS = ['postgres', 'mongodb', 'neo4j', 'basex']
+# One JSON object per benchmark run, appended
+HISTORY_FILE = 'benchmark-history.jsonl'
+TREND_PLOT = 'db_performance_trend.png'
+
+# --- LOAD PHASE (--load, and every scale run) ---
+# As in production: the converter turns the XML dump into JSON Lines, then
+# every backend is reset (untimed) and loaded (timed). In the commands, a .py
+# script runs with this interpreter; {xml} and {jsonl} are the dataset files
+CONVERTED_FILE = '../data/litcovid2BioCJSON.jsonl'
+CONVERT_COMMAND = ['../mongodb/xml_to_json_converter.py', '{xml}', '{jsonl}', '--format', 'jsonl',
+                   '--workers', str(os.cpu_count() or 1)]
+RESET_COMMANDS = {
+    'psql': [['docker', 'exec', 'postgres', 'psql', '-U', 'admin', '-d', 'litcovid_db',
+              '-c', 'TRUNCATE bioc_data, articles, citations RESTART IDENTITY']],
+    'mongodb': [['docker', 'exec', 'mongodb', 'mongosh', 'litcovid_json', '--quiet',
+                 '--eval', 'db.bio_c_json.drop()']],
+    # Deleted in batches: one transaction for the whole graph runs out of memory;
+    # :auto makes cypher-shell send it as the implicit transaction it needs
+    'neo4j': [['docker', 'exec', 'neo4j', 'cypher-shell', '-u', 'neo4j', '-p', 'password',
+               ':auto MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS']],
+    # load_to_basex.py replaces the existing shards and the converter the Parquet parts
+    'basex': [],
+    'parquet': [],
+}
+LOAD_COMMANDS = {
+    'psql': [['../psql/load_to_psql.py', '{jsonl}', '--bulk']],
+    'mongodb': [['../mongodb/load_to_mongo.py', '{jsonl}']],
+    'neo4j': [['../neo4j/load_to_neo4j.py', '{jsonl}', '--batched']],
+    'basex': [['../basex/load_to_basex.py', '{xml}']],
+    # The Parquet tables come from a conversion run with --columnar
+    'parquet': [['../mongodb/xml_to_json_converter.py', '{xml}', '{jsonl}.parquet-run',
+                 '--format', 'jsonl', '--workers', str(os.cpu_count() or 1),
+                 '--columnar', '../data/columnar']],
+}
+# Files a load writes besides the store, removed once it is done, and what
+# the load time includes beyond loading, recorded with its result
+LOAD_BY_PRODUCTS = {'parquet': ['{jsonl}.parquet-run']}
+LOAD_NOTES = {'parquet': "includes the converter's JSON Lines output"}
+# On-disk size of each store once loaded: the first number on the last output line, in bytes
+SIZE_COMMANDS = {
+    'psql': ['docker', 'exec', 'postgres', 'psql', '-U', 'admin', '-d', 'litcovid_db', '-tAc',
+             "SELECT pg_database_size('litcovid_db')"],
+    'mongodb': ['docker', 'exec', 'mongodb', 'mongosh', 'litcovid_json', '--quiet', '--eval',
+                'const s = db.stats(); print(s.storageSize + s.indexSize)'],
+    'neo4j': ['docker', 'exec', 'neo4j', 'du', '-sb', '/data/databases/neo4j'],
+    'basex': ['docker', 'exec', 'basex', 'sh', '-c', 'du -sbc /srv/basex/data/litcovid_xml*'],
+    'parquet': ['du', '-sb', '../data/columnar'],
+}
+# Server containers whose memory is sampled (docker stats) while they load
+LOAD_CONTAINERS = {'psql': 'postgres', 'mongodb': 'mongodb', 'neo4j': 'neo4j', 'basex': 'basex'}
+MEMORY_SAMPLE_SECONDS = 1.0
+
+# --- SCALE RUNS (--scales) ---
+# Every backend is reloaded with a synthetic dataset of SCALE_DOCUMENTS × scale
+# documents (generate-bioc.py), then benchmarked on it
+SCALES = [0.1, 1, 10]
+SCALE_DOCUMENTS = 10000
+SCALE_SEED = 42
+# The XML goes to the folder BaseX reads from (mounted by compose.yml); the
+# JSON Lines file is converted from it
+SYNTHETIC_XML = '../data/basex/synthetic-{documents}-{seed}.xml'
+SYNTHETIC_JSONL = '../data/synthetic/synthetic-{documents}-{seed}.jsonl'
+SCALING_PLOT = 'db_performance_scaling.png'
+
+
+def output_file(db, task):
+    """Return the output file of an export as written, compressed or not, or None."""
+    name = OUTPUT_FILES[db][task]
+    for suffix in ['', *COMPRESSIONS.values()]:
+        if os.path.exists(name + suffix):
+            return name + suffix
+    return None
 
-# Dictionary to store timing results
-results = {db: {'data': 0, 'refs': 0} for db in databases}
 
-print("🚀 Starting Database Performance Benchmark...")
+def remove_output(db, task):
+    name = OUTPUT_FILES[db][task]
+    for suffix in ['', *COMPRESSIONS.values()]:
+        Path(name + suffix).unlink(missing_ok=True)
 
-for db in databases:
-    for task in tasks:
-        script_name = f"export-{task}.py"
-        script_path = f"../{db}/{script_name}"
-        
-        print(f"⏱️  Timing {script_path}...")
-        
+
+def count_lines(path):
+    if path.endswith(tuple(COMPRESSIONS.values())):
+        with open_input(path) as f:
+            return sum(1 for _ in f)
+    count = 0
+    with open(path, 'rb') as f:
+        while chunk := f.read(16 * 1024 * 1024):
+            count += chunk.count(b'\n')
+    return count
+
+
+def run_once(command):
+    """
+    Run one command; return (wall seconds, CPU seconds, peak RSS in MB,
+    error message or None). CPU time and peak RSS are those of the child
+    process alone, read from its rusage. A command that cannot be started
+    (docker not installed, ...) is an error too.
+    """
+    with tempfile.TemporaryFile() as stderr:
         start_time = time.perf_counter()
         try:
-            # Runs the script using the current Python interpreter
-            subprocess.run([sys.executable, script_path], check=True, capture_output=True)
-            end_time = time.perf_counter()
-            
-            duration = end_time - start_time
-            results[db][task] = round(duration, 2)
-            print(f"✅ Finished {db} {task} in {duration:.2f} seconds.")
-        except Exception as e:
-            print(f"❌ Error running {script_path}: {e}")
-            results[db][task] = 0
-
-# Data for Plotting
-data_times = [results[db]['data'] for db in databases]
-refs_times = [results[db]['refs'] for db in databases]
-
-x = np.arange(len(db_display_names))
-width = 0.35
-
-# Generate the Matplotlib Graph
-fig, ax = plt.subplots(figsize=(10, 6))
-rects1 = ax.bar(x - width/2, data_times, width, label='Data Export (Result 1)', color='#3498db')
-rects2 = ax.bar(x + width/2, refs_times, width, label='Refs Export (Result 2)', color='#e67e22')
-
-# Add labels and titles
-ax.set_ylabel('Execution Time (seconds)')
-ax.set_title('Database Export Performance Comparison (9.3GB Dataset)')
-ax.set_xticks(x)
-ax.set_xticklabels(db_display_names)
-ax.legend()
-
-# Function to add values on top of bars
-def autolabel(rects):
-    for rect in rects:
-        height = rect.get_height()
-        ax.annotate(f'{height}s',
-                    xy=(rect.get_x() + rect.get_width() / 2, height),
-                    xytext=(0, 3),
-                    textcoords="offset points",
-                    ha='center', va='bottom', fontweight='bold')
-
-autolabel(rects1)
-autolabel(rects2)
-
-plt.tight_layout()
-plt.savefig('db_performance_comparison.png')
-print("\n📊 Benchmark complete! Graph saved as 'db_performance_comparison.png'.")
-plt.show()
\ No newline at end of file
+            proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=stderr)
+        except OSError as e:
+            return time.perf_counter() - start_time, 0.0, 0.0, f"cannot run {command[0]}: {e}"
+        _, status, usage = os.wait4(proc.pid, 0)
+        wall = time.perf_counter() - start_time
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        error = None
+        if proc.returncode != 0:
+            stderr.seek(0)
+            lines = stderr.read().decode('utf-8', 'replace').strip().splitlines()
+            error = f"exit code {proc.returncode}: {lines[-1] if lines else ''}"
+    # ru_maxrss is in kilobytes on Linux
+    return wall, usage.ru_utime + usage.ru_stime, usage.ru_maxrss / 1024, error
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def summarize(values):
+    return {
+        'median': statistics.median(values),
+        'p95': percentile(values, 0.95),
+        'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
+        'min': min(values),
+        'max': max(values),
+    }
+
+
+def benchmark(db, task, repeat, warmup, script_args):
+    """Time `warmup` + `repeat` runs of one export; failed runs are never timed as 0."""
+    script_path = f"../{db}/export-{task}.py"
+    print(f"⏱️  Timing {script_path} ({warmup} warm-up, {repeat} runs)...")
+
+    walls, cpus, rss = [], [], []
+    for index in range(warmup + repeat):
+        remove_output(db, task)
+        wall, cpu, peak_rss, error = run_once([sys.executable, script_path, *script_args])
+        if error is None and output_file(db, task) is None:
+            error = "no output file written"
+        if error is not None:
+            print(f"❌ {db} {task} failed: {error}")
+            return {'status': 'failed', 'error': error}
+        if index >= warmup:
+            walls.append(wall)
+            cpus.append(cpu)
+            rss.append(peak_rss)
+
+    path = output_file(db, task)
+    lines = count_lines(path)
+    size = os.path.getsize(path)
+    median = statistics.median(walls)
+    result = {
+        'status': 'ok',
+        'seconds': summarize(walls),
+        'runs': [round(wall, 3) for wall in walls],
+        'cpu_seconds': statistics.median(cpus),
+        'peak_rss_mb': max(rss),
+        'lines': lines,
+        'output_bytes': size,
+        'docs_per_s': lines / median,
+        'mb_per_s': size / (1024 * 1024) / median,
+    }
+    print(f"✅ {db} {task}: median {median:.2f}s, p95 {result['seconds']['p95']:.2f}s, "
+          f"σ {result['seconds']['stdev']:.2f}s, {result['docs_per_s']:.0f} docs/s, "
+          f"{result['peak_rss_mb']:.0f} MB peak RSS")
+    return result
+
+
+def command_output(*command):
+    try:
+        return subprocess.run(command, check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_metadata(script_args, label, dataset=DATASET_FILE):
+    repo_dir = Path(__file__).resolve().parent.parent
+    dirty = command_output('git', '-C', str(repo_dir), 'status', '--porcelain', '--untracked-files=no')
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'label': label,
+        'git_sha': command_output('git', '-C', str(repo_dir), 'rev-parse', 'HEAD'),
+        'git_dirty': bool(dirty),
+        'dataset': dataset,
+        'dataset_bytes': os.path.getsize(dataset) if os.path.exists(dataset) else None,
+        'containers': {name: command_output('docker', 'inspect', '--format',
+                                            '{{.Config.Image}}@{{.Image}}', name)
+                       for name in CONTAINERS},
+        'python': platform.python_version(),
+        'host': platform.node(),
+        'cpu_count': os.cpu_count(),
+        'script_args': script_args,
+    }
+
+
+def synthetic_xml(documents, seed):
+    """Return the XML file of a synthetic dataset, generated when missing."""
+    path = SYNTHETIC_XML.format(documents=documents, seed=seed)
+    if not os.path.exists(path):
+        # Written under a temporary name, so an interrupted run is not reused
+        generator = Path(__file__).resolve().parent / 'generate-bioc.py'
+        tmp_path = f"{path}.tmp"
+        subprocess.run([sys.executable, str(generator), tmp_path, '--documents', str(documents),
+                        '--seed', str(seed), '--format', 'xml'], check=True)
+        os.replace(tmp_path, path)
+    return path
+
+
+def format_command(command, xml, jsonl):
+    command = [part.format(xml=xml, jsonl=jsonl) for part in command]
+    return [sys.executable, *command] if command[0].endswith('.py') else command
+
+
+def parse_memory(text):
+    """Return the MB of a docker stats size such as '1.5GiB' or '800kB', or None."""
+    units = {'B': 1, 'kB': 1e3, 'KiB': 1024, 'MB': 1e6, 'MiB': 1024 ** 2,
+             'GB': 1e9, 'GiB': 1024 ** 3, 'TB': 1e12, 'TiB': 1024 ** 4}
+    number = text.rstrip('BkKMGTi')
+    try:
+        return float(number) * units[text[len(number):]] / (1024 * 1024)
+    except (ValueError, KeyError):
+        return None
+
+
+class ContainerMemory:
+    """Peak memory of a container, sampled with docker stats while the block runs."""
+
+    def __init__(self, container):
+        self.container = container
+        self.peak_mb = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while True:
+            usage = command_output('docker', 'stats', '--no-stream', '--format', '{{.MemUsage}}',
+                                   self.container)
+            used = parse_memory(usage.split('/')[0].strip()) if usage else None
+            if used is not None:
+                self.peak_mb = max(self.peak_mb or 0, used)
+            if self._stop.wait(MEMORY_SAMPLE_SECONDS):
+                return
+
+    def __enter__(self):
+        if self.container:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self.container:
+            self._thread.join()
+
+
+def disk_size(db):
+    output = command_output(*SIZE_COMMANDS[db])
+    try:
+        return int(float(output.strip().splitlines()[-1].split()[0]))
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def run_load_stage(commands, xml, jsonl, container=None):
+    """Run the commands of one load stage back to back and time them together."""
+    wall = cpu = peak_rss = 0.0
+    with ContainerMemory(container) as memory:
+        for command in commands:
+            command = format_command(command, xml, jsonl)
+            print(f"📥 {' '.join(command)}")
+            seconds, cpu_seconds, rss, error = run_once(command)
+            wall += seconds
+            cpu += cpu_seconds
+            peak_rss = max(peak_rss, rss)
+            if error is not None:
+                return {'status': 'failed', 'error': error}
+    # A load runs once: the summary has the same fields as an export's
+    return {'status': 'ok', 'seconds': summarize([wall]), 'cpu_seconds': cpu,
+            'peak_rss_mb': peak_rss, 'server_peak_mb': memory.peak_mb}
+
+
+def load_phase(dbs, xml, jsonl):
+    """
+    Convert `xml` to `jsonl`, then reset and load each backend.
+    Return (documents, conversion result, load result per backend).
+    """
+    print(f"🏗️  Converting {xml}...")
+    convert = run_load_stage([CONVERT_COMMAND], xml, jsonl)
+    if convert['status'] != 'ok':
+        print(f"❌ conversion failed: {convert['error']}")
+        error = f"conversion failed: {convert['error']}"
+        return None, convert, {db: {'status': 'failed', 'error': error} for db in dbs}
+    documents = count_lines(jsonl)
+    convert['docs_per_s'] = documents / convert['seconds']['median']
+    print(f"✅ conversion: {convert['seconds']['median']:.2f}s, {convert['docs_per_s']:.0f} docs/s")
+
+    loads = {}
+    for db in dbs:
+        error = None
+        for command in RESET_COMMANDS[db]:
+            _, _, _, error = run_once(format_command(command, xml, jsonl))
+            if error is not None:
+                break
+        if error is None:
+            result = run_load_stage(LOAD_COMMANDS[db], xml, jsonl, LOAD_CONTAINERS.get(db))
+            for path in LOAD_BY_PRODUCTS.get(db, []):
+                Path(path.format(xml=xml, jsonl=jsonl)).unlink(missing_ok=True)
+            if db in LOAD_NOTES:
+                result['note'] = LOAD_NOTES[db]
+        else:
+            result = {'status': 'failed', 'error': f"reset failed: {error}"}
+        if result['status'] == 'ok':
+            seconds = result['seconds']['median']
+            result['docs_per_s'] = documents / seconds if seconds else None
+            result['disk_bytes'] = disk_size(db)
+            disk = f"{result['disk_bytes'] / (1024 * 1024):.1f} MB" if result['disk_bytes'] else "?"
+            server = f"{result['server_peak_mb']:.0f} MB" if result['server_peak_mb'] else "?"
+            print(f"✅ {db} load: {seconds:.2f}s, {result['docs_per_s'] or 0:.0f} docs/s, "
+                  f"{result['peak_rss_mb']:.0f} MB client / {server} server peak, {disk} on disk")
+        else:
+            print(f"❌ {db} load failed: {result['error']}")
+        loads[db] = result
+    return documents, convert, loads
+
+
+def benchmark_exports(run, args, script_args):
+    for db in args.databases:
+        load = run.get('loads', {}).get(db)
+        for task in args.tasks:
+            if load is not None and load['status'] != 'ok':
+                print(f"❌ {db} {task} skipped: not loaded")
+                result = {'status': 'failed', 'error': f"load failed: {load['error']}"}
+            else:
+                result = benchmark(db, task, args.repeat, args.warmup, script_args)
+            run['results'].setdefault(db, {})[task] = result
+
+
+def print_summary(run):
+    """Load next to export cost of every backend in this run."""
+    def seconds(result):
+        ok = result and result.get('status') == 'ok'
+        return f"{result['seconds']['median']:>9.2f}" if ok else f"{'failed' if result else '-':>9}"
+
+    print(f"\n{'':10}{'load s':>9}{'data s':>9}{'refs s':>9}{'disk MB':>9}")
+    for db in databases:
+        if db not in run['results'] and db not in run.get('loads', {}):
+            continue
+        load = run.get('loads', {}).get(db)
+        results = run['results'].get(db, {})
+        disk = load.get('disk_bytes') if load else None
+        disk = f"{disk / (1024 * 1024):>9.1f}" if disk else f"{'-':>9}"
+        note = f"  ({load['note']})" if load and load.get('note') else ""
+        print(f"{db:10}{seconds(load)}{seconds(results.get('data'))}{seconds(results.get('refs'))}{disk}"
+              f"{note}")
+    if 'convert' in run:
+        print(f"{'convert':10}{seconds(run['convert'])}")
+
+
+def run_benchmark(args, script_args, label, xml, jsonl, load, extra_meta=None):
+    """Optionally load `xml`/`jsonl` into every backend, benchmark the exports, append the run."""
+    run = {'meta': run_metadata(script_args, label, xml), 'results': {}}
+    run['meta'].update(extra_meta or {})
+    if load:
+        documents, run['convert'], run['loads'] = load_phase(args.databases, xml, jsonl)
+        run['meta']['documents'] = run['meta'].get('documents', documents)
+    benchmark_exports(run, args, script_args)
+    append_history(args.history, run)
+    print_summary(run)
+
+
+def run_scales(args, script_args):
+    """Benchmark every backend on the synthetic dataset at each scale, one history run per scale."""
+    sweep = datetime.now(timezone.utc).isoformat(timespec='seconds')
+    for scale in args.scales:
+        documents = max(1, round(args.documents * scale))
+        print(f"\n📏 Scale ×{scale:g}: {documents} synthetic documents (seed {args.seed})")
+        xml = synthetic_xml(documents, args.seed)
+        jsonl = SYNTHETIC_JSONL.format(documents=documents, seed=args.seed)
+        Path(jsonl).parent.mkdir(parents=True, exist_ok=True)
+        run_benchmark(args, script_args, f"{args.label or 'scale'} ×{scale:g}", xml, jsonl, load=True,
+                      extra_meta={'sweep': sweep, 'scale': scale, 'documents': documents,
+                                  'seed': args.seed})
+    print(f"Results appended to {args.history}.")
+
+
+def append_history(history_file, run):
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def load_history(history_file):
+    if not os.path.exists(history_file):
+        return []
+    with open(history_file, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def phases(history):
+    """The panels of a graph: the load phase when the runs have one, then the tasks."""
+    return (['load'] if any('loads' in run for run in history) else []) + tasks
+
+
+def series(phase):
+    """(backend, display name) of the lines of a panel; the load panel also shows the conversion."""
+    lines = list(zip(databases, db_display_names))
+    return lines + [('convert', 'Conversion')] if phase == 'load' else lines
+
+
+def phase_result(run, db, phase):
+    if db == 'convert':
+        return run.get('convert', {})
+    if phase == 'load':
+        return run.get('loads', {}).get(db, {})
+    return run['results'].get(db, {}).get(phase, {})
+
+
+def phase_title(phase):
+    return "Load" if phase == 'load' else f"Result {1 if phase == 'data' else 2} export ({phase})"
+
+
+def plot_trends(history, output_png):
+    """One panel per phase: the median of every backend over the runs, p95 as error bar."""
+    # Scale runs use synthetic data and have their own graph
+    history = [run for run in history if 'scale' not in run['meta']]
+    if not history:
+        print("No benchmark runs to plot.")
+        return
+    labels = [run['meta'].get('label') or (run['meta'].get('git_sha') or '?')[:7] for run in history]
+    x = np.arange(len(history))
+    panels = phases(history)
+
+    fig, axes = plt.subplots(len(panels), 1, figsize=(max(8, len(history) * 0.8), 4 * len(panels)),
+                             sharex=True, squeeze=False)
+    for ax, phase in zip(axes[:, 0], panels):
+        for db, display_name in series(phase):
+            medians, upper = [], []
+            for run in history:
+                result = phase_result(run, db, phase)
+                if result.get('status') == 'ok':
+                    medians.append(result['seconds']['median'])
+                    upper.append(result['seconds']['p95'] - result['seconds']['median'])
+                else:
+                    # Missing or failed: a gap in the line, never a 0
+                    medians.append(np.nan)
+                    upper.append(0)
+            if not np.all(np.isnan(medians)):
+                ax.errorbar(x, medians, yerr=[np.zeros(len(upper)), upper], marker='o',
+                            capsize=3, label=display_name)
+        ax.set_title(f"{phase_title(phase)}: median, p95 above")
+        ax.set_ylabel('Execution Time (seconds)')
+        ax.grid(axis='y', alpha=0.3)
+        ax.legend()
+    axes[-1, 0].set_xticks(x)
+    axes[-1, 0].set_xticklabels(labels, rotation=45, ha='right')
+
+    plt.tight_layout()
+    plt.savefig(output_png)
+    print(f"📊 Trend graph saved as '{output_png}'.")
+
+
+def plot_scaling(history, output_png):
+    """One panel per phase: the median of every backend against the dataset size of the last sweep."""
+    sweeps = [run['meta']['sweep'] for run in history if 'sweep' in run['meta']]
+    if not sweeps:
+        return
+    runs = sorted((run for run in history if run['meta'].get('sweep') == sweeps[-1]),
+                  key=lambda run: run['meta']['documents'])
+    documents = [run['meta']['documents'] for run in runs]
+
+    panels = phases(runs)
+
+    fig, axes = plt.subplots(1, len(panels), figsize=(6 * len(panels), 5), squeeze=False)
+    for ax, phase in zip(axes[0], panels):
+        for db, display_name in series(phase):
+            medians = []
+            for run in runs:
+                result = phase_result(run, db, phase)
+                ok = result.get('status') == 'ok'
+                medians.append(result['seconds']['median'] if ok else np.nan)
+            if not np.all(np.isnan(medians)):
+                ax.plot(documents, medians, marker='o', label=display_name)
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('Documents')
+        ax.set_ylabel('Execution Time (seconds, median)')
+        ax.set_title(f"{phase_title(phase)} by dataset size")
+        ax.grid(alpha=0.3)
+        ax.legend()
+
+    plt.tight_layout()
+    plt.savefig(output_png)
+    print(f"📊 Scaling graph saved as '{output_png}'.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the export scripts of every backend.")
+    parser.add_argument('--databases', nargs='+', choices=databases, default=databases)
+    parser.add_argument('--tasks', nargs='+', choices=tasks, default=tasks)
+    parser.add_argument('--repeat', type=int, default=REPEAT, help="timed runs per export")
+    parser.add_argument('--warmup', type=int, default=WARMUP, help="untimed runs first")
+    parser.add_argument('--args', default='',
+                        help="extra arguments for every export script, e.g. \"--workers 4\"")
+    parser.add_argument('--label', default=None, help="name of this run on the trend graph")
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--load', action='store_true',
+                        help=f"first convert {DATASET_FILE} and reset and load every backend with it")
+    parser.add_argument('--plot-only', action='store_true',
+                        help="only redraw the graphs from the history")
+    parser.add_argument('--scales', type=float, nargs='*', default=None,
+                        help=f"load every backend with synthetic data at these scales and "
+                             f"benchmark each one (no value: {' '.join(f'{s:g}' for s in SCALES)})")
+    parser.add_argument('--documents', type=int, default=SCALE_DOCUMENTS,
+                        help="synthetic documents at scale 1")
+    parser.add_argument('--seed', type=int, default=SCALE_SEED)
+    args = parser.parse_args()
+    if args.scales == []:
+        args.scales = SCALES
+
+    if args.scales is not None and not args.plot_only:
+        run_scales(args, shlex.split(args.args))
+    elif not args.plot_only:
+        script_args = shlex.split(args.args)
+        print("🚀 Starting Database Performance Benchmark...")
+        run_benchmark(args, script_args, args.label, DATASET_FILE, CONVERTED_FILE, args.load)
+        print(f"Results appended to {args.history}.")
+
+    history = load_history(args.history)
+    plot_trends(history, TREND_PLOT)
+    plot_scaling(history, SCALING_PLOT)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import math
+import random
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape, quoteattr
+
+# --- CONFIGURATION ---
+DOCUMENTS = 10000
+SEED = 42
+FORMATS = ['xml', 'json', 'jsonl']
+# Document i gets the PMID FIRST_PMID + i (and the same document id)
+FIRST_PMID = 30000000
+# Documents carrying an article-id_pmid infon; the real dump also holds a
+# few without one (the legal notice), which every exporter skips
+PMID_RATIO = 0.99
+# Documents with a TITLE passage; the Neo4j exporters skip the others
+TITLE_RATIO = 0.97
+# Passages per document, drawn uniformly in [min, max]
+ABSTRACT_PASSAGES = (1, 4)
+BODY_PASSAGES = (2, 20)
+BODY_SECTIONS = ['INTRO', 'METHODS', 'RESULTS', 'DISCUSS', 'CONCL']
+# Citation degree (REF passages per document): its mean and distribution;
+# lognormal gives the long tail of review articles with hundreds of references
+REF_MEAN = 30
+DEGREE_DISTRIBUTIONS = ['fixed', 'uniform', 'lognormal']
+DEGREE = 'lognormal'
+DEGREE_SIGMA = 1.0
+# REF passages with a pub-id_pmid infon, and among those the share citing a
+# document of the generated set (the others become reference-only nodes)
+REF_PMID_RATIO = 0.85
+INTERNAL_REF_RATIO = 0.3
+# Words per text, drawn uniformly in [min, max]
+TITLE_WORDS = (6, 20)
+ABSTRACT_WORDS = (40, 200)
+BODY_WORDS = (60, 300)
+
+VOCABULARY = """
+sars-cov-2 covid-19 coronavirus patients infection respiratory severe acute
+syndrome clinical outcomes hospital mortality vaccine antibody immune response
+viral load transmission cohort study analysis treatment therapy trial randomized
+symptoms cases risk factors association age children adults pneumonia lung
+intensive care ventilation oxygen cytokine inflammation protein spike receptor
+ace2 binding variant omicron delta sequencing genome mutation replication cells
+model data results methods significant increased decreased compared between
+during after before among with without higher lower rate ratio confidence
+interval odds hazard observed reported associated effect population public
+health pandemic lockdown mental anxiety depression healthcare workers testing
+pcr antigen serological prevalence incidence surveillance epidemiological
+""".split()
+
+
+def words(rng, bounds):
+    return " ".join(rng.choices(VOCABULARY, k=rng.randint(*bounds)))
+
+
+def citation_degree(rng, distribution, mean, sigma):
+    if mean <= 0:
+        return 0
+    if distribution == 'fixed':
+        return round(mean)
+    if distribution == 'uniform':
+        return rng.randint(0, round(2 * mean))
+    # Lognormal with the requested mean
+    mu = math.log(mean) - sigma * sigma / 2
+    return round(rng.lognormvariate(mu, sigma))
+
+
+def generate_document(index, options):
+    """
+    Build document `index` as the converter would parse it. Every document
+    has its own random generator seeded from (seed, index), so the output is
+    the same whatever the format and however many documents are generated.
+    """
+    rng = random.Random(f"{options.seed}:{index}")
+    pmid = str(FIRST_PMID + index)
+    passages = []
+
+    def add(section_type, passage_type, text, **extra):
+        offset = passages[-1]['offset'] + len(passages[-1].get('text', '')) + 1 if passages else 0
+        passage = {'infons': {**extra, 'section_type': section_type, 'type': passage_type},
+                   'offset': offset}
+        if text:
+            passage['text'] = text
+        passages.append(passage)
+
+    if rng.random() < options.title_ratio:
+        add('TITLE', 'front', words(rng, TITLE_WORDS).capitalize())
+    for _ in range(rng.randint(*options.abstracts)):
+        add('ABSTRACT', 'abstract', words(rng, ABSTRACT_WORDS))
+    for _ in range(rng.randint(*options.body)):
+        add(rng.choice(BODY_SECTIONS), 'paragraph', words(rng, BODY_WORDS))
+    for _ in range(citation_degree(rng, options.degree, options.ref_mean, options.degree_sigma)):
+        extra = {}
+        if rng.random() < REF_PMID_RATIO:
+            if options.documents > 1 and rng.random() < INTERNAL_REF_RATIO:
+                target = rng.randrange(options.documents - 1)
+                extra['pub-id_pmid'] = str(FIRST_PMID + target + (target >= index))
+            else:
+                extra['pub-id_pmid'] = str(rng.randint(1000000, FIRST_PMID - 1))
+        add('REF', 'ref', "", **extra)
+
+    # The PMID sits on the first passage, as in the dump
+    if passages and rng.random() < PMID_RATIO:
+        passages[0]['infons'] = {'article-id_pmid': pmid, **passages[0]['infons']}
+    doc = {'id': pmid}
+    if passages:
+        doc['passages'] = passages
+    return doc
+
+
+def xml_document(doc):
+    parts = [f"<document><id>{escape(doc['id'])}</id>"]
+    for passage in doc.get('passages', []):
+        parts.append("<passage>")
+        for key, value in passage['infons'].items():
+            parts.append(f"<infon key={quoteattr(key)}>{escape(value)}</infon>")
+        parts.append(f"<offset>{passage['offset']}</offset><text>{escape(passage.get('text', ''))}</text>")
+        parts.append("</passage>")
+    parts.append("</document>\n")
+    return "".join(parts)
+
+
+def json_document(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(',', ':'))
+
+
+# Output layouts: (opening, separator between documents, closing, serializer)
+OUTPUT_LAYOUTS = {
+    'xml': ('<?xml version="1.0" encoding="UTF-8"?>'
+            '<!DOCTYPE collection SYSTEM "BioC.dtd">'
+            '<collection><source>synthetic</source><date></date><key>BioC.key</key>\n',
+            '', '</collection>\n', xml_document),
+    'json': ('[\n', ',\n', '\n]\n', json_document),
+    'jsonl': ('', '\n', '\n', json_document),
+}
+
+
+def generate(output_file, output_format, options):
+    """Write `options.documents` documents to `output_file`; return the size written."""
+    opening, separator, closing, serialize = OUTPUT_LAYOUTS[output_format]
+    start_time = time.perf_counter()
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(opening)
+        for index in range(options.documents):
+            if index:
+                f.write(separator)
+            f.write(serialize(generate_document(index, options)))
+            if (index + 1) % 100000 == 0:
+                print(f"Generated {index + 1} documents...")
+        f.write(closing)
+        size = f.tell()
+    print(f"Wrote {options.documents} documents ({size / (1024 * 1024):.1f} MB) to {output_file} "
+          f"in {time.perf_counter() - start_time:.2f} seconds.")
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic BioC dataset, deterministic from its seed.")
+    parser.add_argument('output_file')
+    parser.add_argument('--format', choices=FORMATS, default=None,
+                        help="default: from the file suffix (.xml, .json, .jsonl), else xml")
+    parser.add_argument('--documents', '-n', type=int, default=DOCUMENTS)
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--title-ratio', type=float, default=TITLE_RATIO,
+                        help="share of documents with a TITLE passage")
+    parser.add_argument('--abstracts', type=int, nargs=2, default=ABSTRACT_PASSAGES,
+                        metavar=('MIN', 'MAX'), help="ABSTRACT passages per document")
+    parser.add_argument('--body', type=int, nargs=2, default=BODY_PASSAGES,
+                        metavar=('MIN', 'MAX'), help="body paragraphs per document")
+    parser.add_argument('--ref-mean', type=float, default=REF_MEAN,
+                        help="mean number of REF passages per document")
+    parser.add_argument('--degree', choices=DEGREE_DISTRIBUTIONS, default=DEGREE,
+                        help="distribution of the REF passages per document")
+    parser.add_argument('--degree-sigma', type=float, default=DEGREE_SIGMA,
+                        help="sigma of the lognormal degree distribution")
+    args = parser.parse_args()
+
+    output_format = args.format
+    if output_format is None:
+        suffix = Path(args.output_file).suffix.lstrip('.')
+        output_format = suffix if suffix in FORMATS else 'xml'
+    generate(args.output_file, output_format, args)
+
+
+if __name__ == '__main__':
+    main()
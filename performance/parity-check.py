@@ -0,0 +1,183 @@
+import argparse
+import itertools
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.external_sort import RUN_BYTES, sort_lines  # noqa: E402
+from common.output_sink import COMPRESSIONS, open_input  # noqa: E402
+
+# --- CONFIGURATION ---
+# Output files of the exporters when run from this folder (export-perf.py);
+# the first one found is the reference the others are compared with
+OUTPUTS = {
+    'data': ['postgres-data.txt', 'mongo_result1.txt', 'neo4j-results.txt',
+             'basex_result1.txt', 'parquet-data.txt'],
+    'refs': ['postgres-refs.txt', 'mongo-refs.txt', 'Result2.txt',
+             'basex_result2.txt', 'parquet-refs.txt'],
+}
+SAMPLES = 5
+
+
+# Every line becomes "pmid<TAB>value". Unless strict, whitespace runs in
+# Result 1 count as one space, and Result 2 citation lists are compared as
+# sets: some backends sort and deduplicate them, others keep document order
+def normalize_data(line, strict):
+    pmid, _, text = line.rstrip('\n').partition('/')
+    return pmid.strip(), text if strict else ' '.join(text.split())
+
+
+def normalize_refs(line, strict):
+    pmid, *refs = line.rstrip('\n').split('/')
+    if not strict:
+        refs = sorted({ref.strip() for ref in refs if ref.strip()})
+    return pmid.strip(), '/'.join(refs)
+
+
+NORMALIZERS = {'data': normalize_data, 'refs': normalize_refs}
+
+
+def normalized_lines(path, task, strict):
+    normalize = NORMALIZERS[task]
+    with open_input(path) as f:
+        for line in f:
+            if line.strip():
+                pmid, value = normalize(line, strict)
+                yield f"{pmid}\t{value}\n"
+
+
+def sort_output(job):
+    """Normalize and sort one output file; return (sorted file, lines, seconds)."""
+    path, sorted_path, task, strict, run_bytes, tmp_dir = job
+    start_time = time.perf_counter()
+    count = sort_lines(normalized_lines(path, task, strict), sorted_path, run_bytes, tmp_dir)
+    return sorted_path, count, time.perf_counter() - start_time
+
+
+def groups(sorted_path):
+    """Yield (pmid, sorted values) from a sorted normalized file."""
+    with open(sorted_path, 'r', encoding='utf-8') as f:
+        for pmid, lines in itertools.groupby(f, key=lambda line: line.partition('\t')[0]):
+            yield pmid, [line.partition('\t')[2].rstrip('\n') for line in lines]
+
+
+def compare(reference_path, other_path, samples):
+    """Merge-join two sorted files on pmid; return (counts, samples per mismatch kind)."""
+    counts = Counter()
+    examples = {'missing': [], 'extra': [], 'different': []}
+
+    def record(kind, example):
+        counts[kind] += 1
+        if len(examples[kind]) < samples:
+            examples[kind].append(example)
+
+    reference = groups(reference_path)
+    other = groups(other_path)
+    ref_group = next(reference, None)
+    other_group = next(other, None)
+    while ref_group is not None or other_group is not None:
+        # Lines are sorted as "pmid<TAB>...", so pmids compare with the tab appended
+        ref_key = ref_group[0] + '\t' if ref_group is not None else None
+        other_key = other_group[0] + '\t' if other_group is not None else None
+        if other_key is None or (ref_key is not None and ref_key < other_key):
+            record('missing', ref_group)
+            ref_group = next(reference, None)
+        elif ref_key is None or other_key < ref_key:
+            record('extra', other_group)
+            other_group = next(other, None)
+        else:
+            if ref_group[1] == other_group[1]:
+                counts['matching'] += 1
+            else:
+                record('different', (ref_group, other_group))
+            ref_group = next(reference, None)
+            other_group = next(other, None)
+    return counts, examples
+
+
+def shorten(values, width=100):
+    text = ' | '.join(values)
+    return text if len(text) <= width else text[:width - 3] + '...'
+
+
+def report(reference, other, counts, examples):
+    print(f"\n{reference} vs {other}:")
+    print(f"  matching pmids:     {counts['matching']}")
+    print(f"  only in {reference}: {counts['missing']}")
+    print(f"  only in {other}: {counts['extra']}")
+    print(f"  different content:  {counts['different']}")
+    for pmid, values in examples['missing']:
+        print(f"    missing   {pmid}: {shorten(values)}")
+    for pmid, values in examples['extra']:
+        print(f"    extra     {pmid}: {shorten(values)}")
+    for (pmid, ref_values), (_, other_values) in examples['different']:
+        print(f"    different {pmid}:")
+        print(f"      {reference}: {shorten(ref_values)}")
+        print(f"      {other}: {shorten(other_values)}")
+
+
+def default_outputs(task):
+    """Return the exporter outputs of `task` present here, compressed or not."""
+    found = []
+    for name in OUTPUTS[task]:
+        for suffix in ['', *COMPRESSIONS.values()]:
+            if os.path.exists(name + suffix):
+                found.append(name + suffix)
+                break
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Check that exports of Result 1 or Result 2 hold the same articles.")
+    parser.add_argument('task', choices=sorted(NORMALIZERS))
+    parser.add_argument('files', nargs='*',
+                        help="output files, the first one being the reference "
+                             "(default: the exporter outputs found in this folder)")
+    parser.add_argument('--strict', action='store_true',
+                        help="compare the lines as written, without normalizing whitespace or citation order")
+    parser.add_argument('--samples', type=int, default=SAMPLES,
+                        help="mismatches shown per kind")
+    parser.add_argument('--run-mb', type=int, default=RUN_BYTES // (1024 * 1024),
+                        help="text sorted in memory at once per file")
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help="files sorted in parallel")
+    parser.add_argument('--tmp-dir', default=None,
+                        help="directory for the sorted runs (default: the system temp dir)")
+    args = parser.parse_args()
+
+    files = args.files or default_outputs(args.task)
+    if len(files) < 2:
+        parser.error(f"need at least two files to compare, found: {files}")
+
+    start_time = time.perf_counter()
+    with tempfile.TemporaryDirectory(dir=args.tmp_dir) as tmp_dir:
+        jobs = [(path, os.path.join(tmp_dir, f"sorted-{index}"), args.task, args.strict,
+                 args.run_mb * 1024 * 1024, tmp_dir)
+                for index, path in enumerate(files)]
+        print(f"Sorting {len(files)} files ({args.jobs} at once)...")
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(jobs))) as pool:
+            sorted_files = []
+            for path, (sorted_path, count, seconds) in zip(files, pool.map(sort_output, jobs)):
+                print(f"  {path}: {count} lines sorted in {seconds:.2f} seconds")
+                sorted_files.append(sorted_path)
+
+        mismatches = 0
+        for path, sorted_path in zip(files[1:], sorted_files[1:]):
+            counts, examples = compare(sorted_files[0], sorted_path, args.samples)
+            report(files[0], path, counts, examples)
+            mismatches += counts['missing'] + counts['extra'] + counts['different']
+
+    print(f"\nChecked {len(files)} files in {time.perf_counter() - start_time:.2f} seconds: "
+          f"{'no mismatches' if mismatches == 0 else f'{mismatches} mismatched pmids'}.")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
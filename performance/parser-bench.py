@@ -0,0 +1,72 @@
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.bioc_xml import (  # noqa: E402
+    PARSER_BACKENDS,
+    SegmentReader,
+    find_document_segments,
+    iter_documents,
+)
+
+# --- CONFIGURATION ---
+INPUT_FILE = "../data/basex/litcovid2BioCXML"
+REPEAT = 3
+
+
+def run_backend(path, start, end, backend):
+    """Parse one byte range with a backend; return (seconds, document count, digest)."""
+    digest = hashlib.sha256()
+    count = 0
+    start_time = time.perf_counter()
+    with SegmentReader(path, start, end) as source:
+        for doc in iter_documents(source, backend):
+            digest.update(json.dumps(doc, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+            count += 1
+    return time.perf_counter() - start_time, count, digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the BioC XML parser backends.")
+    parser.add_argument('input_file', nargs='?', default=INPUT_FILE)
+    parser.add_argument('--max-mb', type=int, default=0,
+                        help="only parse the first N MB of documents (0 = whole file)")
+    parser.add_argument('--repeat', type=int, default=REPEAT)
+    parser.add_argument('--backends', nargs='+', default=sorted(PARSER_BACKENDS),
+                        choices=sorted(PARSER_BACKENDS))
+    args = parser.parse_args()
+
+    limit = args.max_mb * 1024 * 1024 or os.path.getsize(args.input_file)
+    segments = find_document_segments(args.input_file, limit)
+    if not segments:
+        parser.error(f"no <document> found in {args.input_file}")
+    start, end = segments[0]
+    size_mb = (end - start) / (1024 * 1024)
+    print(f"Benchmarking parsers on {size_mb:.1f} MB of {args.input_file} ({args.repeat} runs each)")
+
+    reference = None
+    for backend in args.backends:
+        try:
+            runs = [run_backend(args.input_file, start, end, backend) for _ in range(args.repeat)]
+        except ImportError as e:
+            print(f"{backend:>6}: skipped ({e})")
+            continue
+
+        seconds = statistics.median(run[0] for run in runs)
+        _, count, digest = runs[0]
+        if reference is None:
+            reference = digest
+        same = "identical" if digest == reference else "DIFFERENT OUTPUT"
+        print(f"{backend:>6}: {seconds:8.2f}s median | {count / seconds:10.0f} docs/s | "
+              f"{size_mb / seconds:7.1f} MB/s | {count} docs, {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import sys
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
+# --- CONFIGURATION ---
+DB_PARAMS = {
+    "dbname": "litcovid_db",
+    "user": "admin",
+    "password": "admin",
+    "host": "localhost",
+    "port": "5432"
+}
+DATA_OUTPUT_FILE = "./postgres-data.txt"
+REFS_OUTPUT_FILE = "./postgres-refs.txt"
+
+# One pass over bioc_data: the passages of each document are expanded once
+# and title, abstract and references are aggregated together
+QUERY = """
+SELECT
+    d.document->'passages'->0->'infons'->>'article-id_pmid' AS pmid,
+    x.title,
+    x.abstract,
+    x.cited_pmids
+FROM bioc_data d
+CROSS JOIN LATERAL (
+    SELECT
+        (array_agg(p->>'text') FILTER (WHERE p->'infons'->>'section_type' = 'TITLE'))[1] AS title,
+        string_agg(p->>'text', ' ') FILTER (WHERE p->'infons'->>'section_type' = 'ABSTRACT') AS abstract,
+        string_agg(p->'infons'->>'pub-id_pmid', '/') FILTER (WHERE p->'infons'->>'section_type' = 'REF') AS cited_pmids
+    FROM jsonb_array_elements(d.document->'passages') AS p
+) x;
+"""
+
+# Both results from the normalized tables (load_to_psql.py --schema normalized)
+NORMALIZED_QUERY = """
+SELECT a.pmid, a.title, a.abstract, c.cited_pmids
+FROM articles a
+LEFT JOIN (
+    SELECT article_id, string_agg(ref_pmid, '/' ORDER BY ord) AS cited_pmids
+    FROM citations
+    GROUP BY article_id
+) c ON c.article_id = a.id
+ORDER BY a.id;
+"""
+
+def export_postgres_all(normalized=False, compression=None):
+    conn = psycopg2.connect(**DB_PARAMS)
+    # We give the cursor a name to enable "Server-Side" streaming
+    cur = conn.cursor(name="fetch_results")
+
+    print(f"Exporting Result 1 to {DATA_OUTPUT_FILE} and Result 2 to {REFS_OUTPUT_FILE}...")
+    cur.execute(NORMALIZED_QUERY if normalized else QUERY)
+
+    with open_output(DATA_OUTPUT_FILE, compression) as data_file, \
+            open_output(REFS_OUTPUT_FILE, compression) as refs_file:
+        count = 0
+        refs_count = 0
+        while True:
+            rows = cur.fetchmany(1000)
+            if not rows:
+                break
+
+            for pmid, title, abstract, cited_pmids in rows:
+                if not pmid:
+                    continue
+                # Format: PMID/Title Abstract
+                data_file.write(f"{pmid}/{title or ''} {abstract or ''}\n")
+                count += 1
+                # Only write if the article actually has references
+                if cited_pmids:
+                    refs_file.write(f"{pmid}/{cited_pmids}\n")
+                    refs_count += 1
+
+            if count % 10000 == 0:
+                print(f"Processed {count} documents...")
+
+    cur.close()
+    conn.close()
+    print(f"SUCCESS: Exported {count} lines and {refs_count} citation rows.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Result 1 and Result 2 from PostgreSQL in one pass.")
+    parser.add_argument("--normalized", action="store_true",
+                        help="read the articles/citations tables instead of bioc_data JSONB")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write both outputs compressed in parallel blocks")
+    args = parser.parse_args()
+    export_postgres_all(args.normalized, args.compress)
@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import importlib
+import sys
+from pathlib import Path
+
+import asyncpg
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.async_export import BATCH_SIZE, QUEUE_SIZE, run_export  # noqa: E402
+from common.output_sink import COMPRESSIONS  # noqa: E402
+
+# --- CONFIGURATION ---
+# Queries, formatting, connection settings and output files are those of the
+# synchronous exporters, so both produce the same files
+EXPORTERS = {"data": "export-data", "refs": "export-refs"}
+PREFETCH = 2000
+
+async def fetch_rows(db_params, query, prefetch):
+    conn = await asyncpg.connect(user=db_params["user"], password=db_params["password"],
+                                 host=db_params["host"], port=int(db_params["port"]),
+                                 database=db_params["dbname"])
+    try:
+        # asyncpg cursors are server-side and need a transaction
+        async with conn.transaction():
+            async for record in conn.cursor(query.strip().rstrip(";"), prefetch=prefetch):
+                yield record
+    finally:
+        await conn.close()
+
+def export_async(task, normalized=False, batch_size=BATCH_SIZE, queue_size=QUEUE_SIZE,
+                 prefetch=PREFETCH, compression=None):
+    exporter = importlib.import_module(EXPORTERS[task])
+    query = exporter.NORMALIZED_QUERY if normalized else exporter.QUERY
+    print(f"Exporting {task} to {exporter.OUTPUT_FILE} with asyncpg...")
+    rows = fetch_rows(exporter.DB_PARAMS, query, prefetch)
+    count = asyncio.run(run_export(rows, exporter.format_row, exporter.OUTPUT_FILE,
+                                   batch_size, queue_size, compression=compression))
+    print(f"SUCCESS: Exported {count} lines.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export Result 1 or Result 2 from PostgreSQL with overlapping fetch, format and write.")
+    parser.add_argument("task", choices=sorted(EXPORTERS))
+    parser.add_argument("--normalized", action="store_true",
+                        help="read the articles/citations tables instead of bioc_data JSONB")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--queue-size", type=int, default=QUEUE_SIZE,
+                        help="batches buffered between two stages")
+    parser.add_argument("--prefetch", type=int, default=PREFETCH,
+                        help="rows fetched per cursor round trip")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    export_async(args.task, args.normalized, args.batch_size, args.queue_size, args.prefetch,
+                 args.compress)
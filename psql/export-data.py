@@ -1,5 +1,16 @@
+import argparse
+import sys
+from pathlib import Path
+
 import psycopg2
 
+from incremental_export import export_incremental
+from parallel_export import export_parallel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 DB_PARAMS = {
     "dbname": "litcovid_db",
@@ -10,40 +21,54 @@ DB_PARAMS = {
 }
 OUTPUT_FILE = "./postgres-data.txt"
 
-def export_postgres_data():
+# Result 1 read straight from the normalized table (load_to_psql.py --schema normalized)
+NORMALIZED_QUERY = "SELECT pmid, title, abstract FROM articles ORDER BY id;"
+
+# Query logic:
+# 1. Expand the 'passages' array
+# 2. Extract PMID from infons
+# 3. Filter for Title and Abstract sections
+SELECT_RESULT1 = """
+SELECT 
+    document->'passages'->0->'infons'->>'article-id_pmid' as pmid,
+    (SELECT p->>'text' FROM jsonb_array_elements(document->'passages') p 
+     WHERE p->'infons'->>'section_type' = 'TITLE' LIMIT 1) as title,
+    (SELECT string_agg(p->>'text', ' ') FROM jsonb_array_elements(document->'passages') p 
+     WHERE p->'infons'->>'section_type' = 'ABSTRACT') as abstract
+FROM bioc_data
+"""
+QUERY = SELECT_RESULT1 + ";"
+# One slice of the SERIAL id per worker in parallel mode (--workers), or the
+# ids past the watermark in incremental mode (--incremental)
+RANGE_QUERY = SELECT_RESULT1 + "WHERE id >= %(start)s AND id < %(end)s;"
+
+def format_row(row):
+    pmid, title, abstract = row
+    if not pmid:
+        return None
+    # Format: PMID/Title Abstract
+    return f"{pmid}/{title or ''} {abstract or ''}\n"
+
+def export_postgres_data(normalized=False, compression=None):
     conn = psycopg2.connect(**DB_PARAMS)
     # We give the cursor a name to enable "Server-Side" streaming
     cur = conn.cursor(name="fetch_result1")
     
     print(f"Exporting Result 1 to {OUTPUT_FILE}...")
     
-    # Query logic:
-    # 1. Expand the 'passages' array
-    # 2. Extract PMID from infons
-    # 3. Filter for Title and Abstract sections
-    query = """
-    SELECT 
-        document->'passages'->0->'infons'->>'article-id_pmid' as pmid,
-        (SELECT p->>'text' FROM jsonb_array_elements(document->'passages') p 
-         WHERE p->'infons'->>'section_type' = 'TITLE' LIMIT 1) as title,
-        (SELECT string_agg(p->>'text', ' ') FROM jsonb_array_elements(document->'passages') p 
-         WHERE p->'infons'->>'section_type' = 'ABSTRACT') as abstract
-    FROM bioc_data;
-    """
-    
-    cur.execute(query)
+    cur.execute(NORMALIZED_QUERY if normalized else QUERY)
     
-    with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+    with open_output(OUTPUT_FILE, compression) as f:
         count = 0
         while True:
             rows = cur.fetchmany(1000)
             if not rows:
                 break
                 
-            for pmid, title, abstract in rows:
-                if pmid:
-                    # Format: PMID/Title Abstract
-                    f.write(f"{pmid}/{title or ''} {abstract or ''}\n")
+            for row in rows:
+                line = format_row(row)
+                if line is not None:
+                    f.write(line)
                     count += 1
             
             if count % 10000 == 0:
@@ -54,4 +79,22 @@ def export_postgres_data():
     print(f"SUCCESS: Exported {count} lines.")
 
 if __name__ == "__main__":
-    export_postgres_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 1 from PostgreSQL.")
+    parser.add_argument("--normalized", action="store_true",
+                        help="read the articles table instead of bioc_data JSONB")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split bioc_data by id and export the slices over parallel connections")
+    parser.add_argument("--no-merge", action="store_true",
+                        help="in parallel mode, leave one shard file per worker")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the rows loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    if args.incremental:
+        export_incremental(DB_PARAMS, RANGE_QUERY, OUTPUT_FILE, format_row, args.compress)
+    elif args.workers > 1 and not args.normalized:
+        export_parallel(DB_PARAMS, RANGE_QUERY, OUTPUT_FILE, format_row, args.workers,
+                        merge=not args.no_merge, compression=args.compress)
+    else:
+        export_postgres_data(args.normalized, args.compress)
\ No newline at end of file
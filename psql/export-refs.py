@@ -1,5 +1,16 @@
+import argparse
+import sys
+from pathlib import Path
+
 import psycopg2
 
+from incremental_export import export_incremental
+from parallel_export import export_parallel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import COMPRESSIONS, open_output  # noqa: E402
+
 # --- CONFIGURATION ---
 DB_PARAMS = {
     "dbname": "litcovid_db",
@@ -10,7 +21,43 @@ DB_PARAMS = {
 }
 OUTPUT_FILE = "./postgres-refs.txt"
 
-def export_postgres_refs():
+# Result 2 read from the normalized citations table (load_to_psql.py --schema normalized):
+# one line per document, references in document order
+NORMALIZED_QUERY = """
+SELECT source_pmid, string_agg(ref_pmid, '/' ORDER BY ord) AS cited_pmids
+FROM citations
+GROUP BY article_id, source_pmid
+ORDER BY article_id;
+"""
+
+# SQL Logic:
+# 1. Get the source PMID from the first passage's metadata.
+# 2. Subquery: Expand 'passages', filter for 'REF' sections, 
+#    and aggregate the reference PMIDs with a '/'.
+SELECT_RESULT2 = """
+SELECT 
+    document->'passages'->0->'infons'->>'article-id_pmid' as source_pmid,
+    (
+        SELECT string_agg(p->'infons'->>'pub-id_pmid', '/')
+        FROM jsonb_array_elements(document->'passages') AS p
+        WHERE p->'infons'->>'section_type' = 'REF'
+    ) as cited_pmids
+FROM bioc_data
+WHERE document->'passages'->0->'infons'->>'article-id_pmid' IS NOT NULL
+"""
+QUERY = SELECT_RESULT2 + ";"
+# One slice of the SERIAL id per worker in parallel mode (--workers), or the
+# ids past the watermark in incremental mode (--incremental)
+RANGE_QUERY = SELECT_RESULT2 + "AND id >= %(start)s AND id < %(end)s;"
+
+def format_row(row):
+    source_pmid, cited_pmids = row
+    # Only write if the article actually has references
+    if not cited_pmids:
+        return None
+    return f"{source_pmid}/{cited_pmids}\n"
+
+def export_postgres_refs(normalized=False, compression=None):
     conn = None
     try:
         conn = psycopg2.connect(**DB_PARAMS)
@@ -19,25 +66,9 @@ def export_postgres_refs():
         
         print(f"Streaming data from PostgreSQL to {OUTPUT_FILE}...")
 
-        # SQL Logic:
-        # 1. Get the source PMID from the first passage's metadata.
-        # 2. Subquery: Expand 'passages', filter for 'REF' sections, 
-        #    and aggregate the reference PMIDs with a '/'.
-        query = """
-        SELECT 
-            document->'passages'->0->'infons'->>'article-id_pmid' as source_pmid,
-            (
-                SELECT string_agg(p->'infons'->>'pub-id_pmid', '/')
-                FROM jsonb_array_elements(document->'passages') AS p
-                WHERE p->'infons'->>'section_type' = 'REF'
-            ) as cited_pmids
-        FROM bioc_data
-        WHERE document->'passages'->0->'infons'->>'article-id_pmid' IS NOT NULL;
-        """
-
-        cur.execute(query)
+        cur.execute(NORMALIZED_QUERY if normalized else QUERY)
 
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
+        with open_output(OUTPUT_FILE, compression) as f:
             count = 0
             while True:
                 # Fetching in batches to keep memory usage low
@@ -45,10 +76,10 @@ def export_postgres_refs():
                 if not rows:
                     break
                 
-                for source_pmid, cited_pmids in rows:
-                    # Only write if the article actually has references
-                    if cited_pmids:
-                        f.write(f"{source_pmid}/{cited_pmids}\n")
+                for row in rows:
+                    line = format_row(row)
+                    if line is not None:
+                        f.write(line)
                         count += 1
                 
                 if count % 10000 == 0 and count > 0:
@@ -64,4 +95,22 @@ def export_postgres_refs():
             conn.close()
 
 if __name__ == "__main__":
-    export_postgres_refs()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export Result 2 from PostgreSQL.")
+    parser.add_argument("--normalized", action="store_true",
+                        help="read the citations table instead of bioc_data JSONB")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="split bioc_data by id and export the slices over parallel connections")
+    parser.add_argument("--no-merge", action="store_true",
+                        help="in parallel mode, leave one shard file per worker")
+    parser.add_argument("--incremental", action="store_true",
+                        help="append only the rows loaded since the last incremental export")
+    parser.add_argument("--compress", choices=sorted(COMPRESSIONS),
+                        help="write the output compressed in parallel blocks")
+    args = parser.parse_args()
+    if args.incremental:
+        export_incremental(DB_PARAMS, RANGE_QUERY, OUTPUT_FILE, format_row, args.compress)
+    elif args.workers > 1 and not args.normalized:
+        export_parallel(DB_PARAMS, RANGE_QUERY, OUTPUT_FILE, format_row, args.workers,
+                        merge=not args.no_merge, compression=args.compress)
+    else:
+        export_postgres_refs(args.normalized, args.compress)
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Incremental export of bioc_data.
+The SERIAL id is the watermark: only the rows loaded after the previous
+incremental export (id above its watermark, up to the current max(id)) are
+exported and appended to the output file. Without a valid watermark the whole
+table is exported and the file rewritten.
+Ids restart from 1 after a reload (TRUNCATE ... RESTART IDENTITY, or the
+staging table swap of load_to_psql.py --unlogged), so the watermark also
+keeps a hash of the row at its id; when that row changed (a reload, or a
+delta replacing that very document), the export starts over.
+Documents replaced by a delta load (load_to_psql.py with REPLACE_EXISTING)
+are updated in place and keep their id, so an incremental export does not
+pick up their new content: run a full export after a delta that changes
+documents. Only new rows are appended.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output, output_path  # noqa: E402
+from common.watermark import load_watermark, save_watermark  # noqa: E402
+
+ROW_CHECK_QUERY = "SELECT md5(document::text) FROM bioc_data WHERE id = %s"
+
+
+def _row_check(conn, row_id):
+    with conn.cursor() as cur:
+        cur.execute(ROW_CHECK_QUERY, (row_id,))
+        row = cur.fetchone()
+    return row[0] if row else None
+
+
+def export_incremental(db_params, range_query, output_file, format_row, compression=None):
+    """
+    Run `range_query` (with %(start)s and %(end)s id bounds) on the ids past
+    the watermark of `output_file` and append the lines to it. `format_row`
+    turns a row into an output line, or None to skip it.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    path = output_path(output_file, compression)
+
+    conn = psycopg2.connect(**db_params)
+    try:
+        after = load_watermark(path, check=lambda row_id: _row_check(conn, row_id))
+        with conn.cursor() as cur:
+            cur.execute("SELECT max(id) FROM bioc_data")
+            high = cur.fetchone()[0]
+        if high is None or (after is not None and high <= after):
+            print(f"Nothing to export: no rows past id {after}.")
+            return 0
+        start = 0 if after is None else after + 1
+        print(f"Exporting ids {start} to {high} ({'appending' if after is not None else 'full export'})...")
+
+        count = 0
+        cur = conn.cursor(name="fetch_incremental")
+        # The upper bound keeps rows inserted meanwhile for the next run
+        cur.execute(range_query, {"start": start, "end": high + 1})
+        with open_output(output_file, compression, append=after is not None) as f:
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    line = format_row(row)
+                    if line is not None:
+                        f.write(line)
+                        count += 1
+        cur.close()
+        check = _row_check(conn, high)
+    finally:
+        conn.close()
+
+    save_watermark(path, high, check)
+    print(f"Exported {count} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return count
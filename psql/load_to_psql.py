@@ -1,7 +1,25 @@
+import argparse
+import io
 import json
+import multiprocessing
+import os
+import sys
+import time
+from pathlib import Path
+
 import psycopg2
 from psycopg2.extras import execute_values
-import ijson  # Install with: pip install ijson
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.articles import extract_article  # noqa: E402
+from common.bulk_formats import pg_copy_row  # noqa: E402
+from common.ndjson import (  # noqa: E402
+    is_json_lines,
+    iter_documents,
+    iter_lines,
+    split_line_ranges,
+)
 
 # --- CONFIGURATION ---
 DB_PARAMS = {
@@ -12,46 +30,145 @@ DB_PARAMS = {
     "port": "5432"
 }
 
+# Either the JSON array or the JSON Lines output of the converter
 FILE_PATH = '../data/postgres/litcovid2BioCJSON-converted'
+# Set to True when FILE_PATH is a delta written with --previous-manifest:
+# rows with the same document id are updated in place (keeping their id)
+# instead of duplicated
+REPLACE_EXISTING = False
+# raw: bioc_data JSONB only, normalized: articles/citations tables only, both: all three
+SCHEMA = "raw"
+NORMALIZED_DDL = Path(__file__).resolve().parent.parent / "init-scripts" / "02_init_articles.sql"
+NORMALIZED_CHUNK = 5000
+
+# --- BULK MODE (--bulk) ---
+WORKERS = os.cpu_count()
+STAGING_TABLE = "bioc_data_staging"
+# Secondary indexes of bioc_data (see init-scripts/01_init_bioc.sql),
+# dropped before a bulk load and rebuilt once it is done, or has failed
+INDEXES = {
+    "idx_pmid": "CREATE INDEX IF NOT EXISTS idx_pmid ON bioc_data "
+                "((document->'passages'->0->'infons'->>'article-id_pmid'))",
+    "idx_doc_id": "CREATE INDEX IF NOT EXISTS idx_doc_id ON bioc_data ((document->>'id'))",
+}
+# Same for the normalized tables (see init-scripts/02_init_articles.sql)
+NORMALIZED_INDEXES = {
+    "idx_articles_pmid": "CREATE INDEX IF NOT EXISTS idx_articles_pmid ON articles (pmid)",
+    "idx_citations_source_pmid": "CREATE INDEX IF NOT EXISTS idx_citations_source_pmid "
+                                 "ON citations (source_pmid)",
+}
 
-def stream_json_objects(path):
+def stream_json_objects(path, start=0, end=None):
     """
-    Streams individual objects from a large JSON array.
+    Streams individual objects from a large JSON array or JSON Lines file.
     This prevents memory crashes with your 9GB file.
+    JSON Lines records are passed through as-is, without decoding them.
     """
-    with open(path, 'rb') as f:
-        # ijson.items(f, 'item') handles the [ {}, {}, ... ] structure
-        for obj in ijson.items(f, 'item'):
-            try:
-                # Return as a tuple (json_string,) for PostgreSQL JSONB
-                yield (json.dumps(obj),)
-            except (json.JSONDecodeError, TypeError):
-                continue
-
-def run_import():
+    if is_json_lines(path):
+        for line in iter_lines(path, start, end):
+            # Return as a tuple (json_string,) for PostgreSQL JSONB
+            yield (line.decode('utf-8'),)
+        return
+
+    for obj in iter_documents(path):
+        try:
+            yield (json.dumps(obj),)
+        except (TypeError, ValueError):
+            continue
+
+def ensure_normalized_tables(cur):
+    with open(NORMALIZED_DDL, "r", encoding="utf-8") as f:
+        cur.execute(f.read())
+
+def copy_articles(cur, docs):
+    """COPY the articles and citations rows extracted from decoded documents."""
+    rows = [article for article in map(extract_article, docs) if article['pmid']]
+    if not rows:
+        return 0
+    # Reserve the article ids up front, so both tables can be COPYed
+    cur.execute("SELECT nextval('articles_id_seq') FROM generate_series(1, %s)", (len(rows),))
+    article_ids = sorted(article_id for (article_id,) in cur.fetchall())
+
+    articles = io.StringIO()
+    citations = io.StringIO()
+    pmids = []
+    for article_id, article in zip(article_ids, rows):
+        pmid = article['pmid']
+        pmids.append(pmid)
+        articles.write(pg_copy_row(article_id, pmid, article['title'], article['abstract']))
+        for position, ref_pmid in enumerate(article['ref_pmids']):
+            citations.write(pg_copy_row(article_id, position, pmid, ref_pmid))
+
+    if REPLACE_EXISTING:
+        cur.execute("DELETE FROM articles WHERE pmid = ANY(%s)", (pmids,))
+        cur.execute("DELETE FROM citations WHERE source_pmid = ANY(%s)", (pmids,))
+    articles.seek(0)
+    citations.seek(0)
+    cur.copy_expert("COPY articles (id, pmid, title, abstract) FROM STDIN", articles)
+    cur.copy_expert("COPY citations (article_id, ord, source_pmid, ref_pmid) FROM STDIN", citations)
+    return len(pmids)
+
+def replace_batch(cur, query, batch):
+    """
+    Update the rows of the documents already loaded, keeping their SERIAL id
+    (the incremental export watermark), and insert the others.
+    """
+    by_id = {}
+    new_rows = []
+    for (doc_json,) in batch:
+        doc_id = json.loads(doc_json).get('id')
+        if doc_id:
+            by_id[doc_id] = doc_json
+        else:
+            new_rows.append((doc_json,))
+    if by_id:
+        updated = execute_values(
+            cur,
+            "UPDATE bioc_data SET document = v.document::jsonb "
+            "FROM (VALUES %s) AS v (doc_id, document) "
+            "WHERE bioc_data.document->>'id' = v.doc_id RETURNING v.doc_id",
+            list(by_id.items()), fetch=True)
+        for (doc_id,) in updated:
+            by_id.pop(doc_id, None)
+        new_rows.extend((doc_json,) for doc_json in by_id.values())
+    if new_rows:
+        execute_values(cur, query, new_rows)
+
+def insert_batch(cur, query, batch, schema=SCHEMA):
+    if schema != "normalized":
+        if REPLACE_EXISTING:
+            replace_batch(cur, query, batch)
+        else:
+            execute_values(cur, query, batch)
+    if schema != "raw":
+        copy_articles(cur, (json.loads(doc_json) for (doc_json,) in batch))
+
+def run_import(path=FILE_PATH, schema=SCHEMA):
     conn = None
     try:
         conn = psycopg2.connect(**DB_PARAMS)
         cur = conn.cursor()
         
-        print(f"Starting import of {FILE_PATH}...")
+        print(f"Starting import of {path}...")
+        if schema != "raw":
+            ensure_normalized_tables(cur)
         query = "INSERT INTO bioc_data (document) VALUES %s"
         
         batch = []
         total_count = 0
         
-        for doc_tuple in stream_json_objects(FILE_PATH):
+        for doc_tuple in stream_json_objects(path):
             batch.append(doc_tuple)
             
             if len(batch) >= 500:
-                execute_values(cur, query, batch)
+                insert_batch(cur, query, batch, schema)
                 conn.commit()
                 total_count += len(batch)
                 batch = []
                 print(f"Imported {total_count} documents...")
 
         if batch:
-            execute_values(cur, query, batch)
+            insert_batch(cur, query, batch, schema)
             conn.commit()
             total_count += len(batch)
 
@@ -64,5 +181,210 @@ def run_import():
             cur.close()
             conn.close()
 
+class CopyStream:
+    """Minimal file object that feeds COPY ... FROM STDIN from an iterator of lines."""
+
+    def __init__(self, lines):
+        self._lines = lines
+        self._buffer = b""
+        self.count = 0
+
+    def read(self, size=-1):
+        chunks = [self._buffer]
+        length = len(self._buffer)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            chunks.append(line)
+            length += len(line)
+            self.count += 1
+        data = b"".join(chunks)
+        if size < 0:
+            self._buffer = b""
+            return data
+        data, self._buffer = data[:size], data[size:]
+        return data
+
+def copy_lines(path, start=0, end=None, copy_text=False):
+    """
+    Yield COPY text lines for bioc_data(document).
+    JSON Lines records only need their backslashes escaped; a JSON array is
+    decoded and re-serialized; copy_text input (converter --pg-copy) is used as-is.
+    """
+    if copy_text or is_json_lines(path):
+        for line in iter_lines(path, start, end):
+            yield (line if copy_text else line.replace(b"\\", b"\\\\")) + b"\n"
+        return
+
+    for (doc_json,) in stream_json_objects(path):
+        yield doc_json.replace("\\", "\\\\").encode("utf-8") + b"\n"
+
+def iter_range_documents(path, start, end, copy_text):
+    if copy_text:
+        for line in iter_lines(path, start, end):
+            # Undo the COPY escaping of backslashes before decoding
+            yield json.loads(line.replace(b"\\\\", b"\\"))
+    else:
+        yield from iter_documents(path, start, end)
+
+def copy_range(task):
+    """COPY one byte range of the input on its own connection (runs in a worker process)."""
+    path, start, end, table, copy_text, schema = task
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        count = 0
+        with conn.cursor() as cur:
+            if schema != "normalized":
+                stream = CopyStream(copy_lines(path, start, end, copy_text))
+                cur.copy_expert(f"COPY {table} (document) FROM STDIN", stream, size=1024 * 1024)
+                count = stream.count
+            if schema != "raw":
+                chunk = []
+                for doc in iter_range_documents(path, start, end, copy_text):
+                    chunk.append(doc)
+                    if len(chunk) >= NORMALIZED_CHUNK:
+                        copy_articles(cur, chunk)
+                        chunk = []
+                    if schema == "normalized":
+                        count += 1
+                copy_articles(cur, chunk)
+        conn.commit()
+        return count
+    finally:
+        conn.close()
+
+def run_bulk_import(path=FILE_PATH, workers=WORKERS, unlogged=False, copy_text=False,
+                    schema=SCHEMA):
+    """
+    Load the file with parallel COPY streams, one connection per worker.
+    Secondary indexes of the loaded tables are dropped first and rebuilt
+    afterwards, even when the load fails, then the tables are analyzed. With unlogged=True the rows go to
+    an UNLOGGED staging table that becomes bioc_data (or is appended to it)
+    once every worker is done; it is dropped if the load fails. A delta
+    (REPLACE_EXISTING) always goes through the staging table, then updates the
+    rows of the documents already loaded, keeping their id, and adds the others.
+    The normalized articles/citations tables are filled according to `schema`.
+    """
+    start_time = time.perf_counter()
+    if not (copy_text or is_json_lines(path)):
+        # A JSON array cannot be split, so it is streamed by a single worker
+        workers = 1
+    ranges = split_line_ranges(path, workers) if workers > 1 else [(0, None)]
+    replace = REPLACE_EXISTING and schema != "normalized"
+    staged = unlogged or replace
+    table = STAGING_TABLE if staged else "bioc_data"
+
+    conn = psycopg2.connect(**DB_PARAMS)
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        raw = schema != "normalized"
+        indexes = {}
+        if raw:
+            indexes.update(INDEXES)
+        if schema != "raw":
+            ensure_normalized_tables(cur)
+            indexes.update(NORMALIZED_INDEXES)
+        print(f"Dropping secondary indexes before loading: {', '.join(indexes)}")
+        for index in indexes:
+            cur.execute(f"DROP INDEX IF EXISTS {index}")
+
+        loaded = False
+        try:
+            if raw and staged:
+                cur.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+                cur.execute(f"CREATE UNLOGGED TABLE {STAGING_TABLE} (id SERIAL, document JSONB)")
+
+            print(f"Starting COPY of {path} into {table} with {len(ranges)} workers...")
+            tasks = [(str(path), start, end, table, copy_text, schema) for start, end in ranges]
+            total_count = 0
+            with multiprocessing.Pool(len(tasks)) as pool:
+                for count in pool.imap_unordered(copy_range, tasks):
+                    total_count += count
+                    rate = total_count / (time.perf_counter() - start_time)
+                    print(f"Imported {total_count} documents ({rate:.0f} docs/s)...")
+
+            if replace:
+                apply_staged_delta(cur)
+            elif raw and unlogged:
+                merge_staging_table(cur)
+            loaded = True
+        finally:
+            restore_after_bulk_load(conn, cur, indexes.values(),
+                                    drop_staging=raw and staged and not loaded)
+
+        if raw:
+            cur.execute("ANALYZE bioc_data")
+        if schema != "raw":
+            cur.execute("ANALYZE articles, citations")
+
+        duration = time.perf_counter() - start_time
+        print(f"SUCCESS: Imported {total_count} documents total in {duration:.2f} seconds.")
+    finally:
+        cur.close()
+        conn.close()
+
+def restore_after_bulk_load(conn, cur, indexes, drop_staging):
+    """Rebuild the secondary indexes, and drop the staging table of a failed load."""
+    if conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        # Interrupted inside the staging table swap
+        cur.execute("ROLLBACK")
+    if drop_staging:
+        print(f"Load failed: dropping {STAGING_TABLE}...")
+        cur.execute(f"DROP TABLE IF EXISTS {STAGING_TABLE}")
+    print("Rebuilding indexes...")
+    for statement in indexes:
+        cur.execute(statement)
+
+def apply_staged_delta(cur):
+    """Update bioc_data from the staged delta by document id, insert the new documents."""
+    print(f"Applying the delta in {STAGING_TABLE} to bioc_data...")
+    cur.execute("BEGIN")
+    cur.execute(f"UPDATE bioc_data b SET document = s.document FROM {STAGING_TABLE} s "
+                "WHERE b.document->>'id' = s.document->>'id'")
+    cur.execute(f"INSERT INTO bioc_data (document) SELECT s.document FROM {STAGING_TABLE} s "
+                "WHERE NOT EXISTS (SELECT 1 FROM bioc_data b WHERE b.document->>'id' = s.document->>'id') "
+                "ORDER BY s.id")
+    cur.execute(f"DROP TABLE {STAGING_TABLE}")
+    cur.execute("COMMIT")
+
+def merge_staging_table(cur):
+    """Replace an empty bioc_data by the staging table, or append the staged rows to it."""
+    cur.execute(f"ALTER TABLE {STAGING_TABLE} SET LOGGED")
+    cur.execute("SELECT NOT EXISTS (SELECT 1 FROM bioc_data)")
+    if cur.fetchone()[0]:
+        print(f"Swapping {STAGING_TABLE} in as bioc_data...")
+        cur.execute("BEGIN")
+        cur.execute("DROP TABLE bioc_data")
+        cur.execute(f"ALTER TABLE {STAGING_TABLE} RENAME TO bioc_data")
+        cur.execute(f"ALTER SEQUENCE {STAGING_TABLE}_id_seq RENAME TO bioc_data_id_seq")
+        cur.execute("ALTER TABLE bioc_data ADD PRIMARY KEY (id)")
+        cur.execute("COMMIT")
+    else:
+        print(f"Appending {STAGING_TABLE} to bioc_data...")
+        cur.execute(f"INSERT INTO bioc_data (document) SELECT document FROM {STAGING_TABLE} ORDER BY id")
+        cur.execute(f"DROP TABLE {STAGING_TABLE}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load converted BioC JSON into PostgreSQL.")
+    parser.add_argument("file_path", nargs="?", default=FILE_PATH)
+    parser.add_argument("--bulk", action="store_true",
+                        help="parallel COPY load with deferred index creation")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="parallel COPY connections in bulk mode")
+    parser.add_argument("--unlogged", action="store_true",
+                        help="bulk load through an UNLOGGED staging table")
+    parser.add_argument("--copy-text", action="store_true",
+                        help="the input is COPY text written by the converter's --pg-copy")
+    parser.add_argument("--schema", choices=["raw", "normalized", "both"], default=SCHEMA,
+                        help="load bioc_data JSONB, the articles/citations tables, or both")
+    args = parser.parse_args()
+
+    if args.bulk:
+        run_bulk_import(args.file_path, args.workers, args.unlogged, args.copy_text, args.schema)
+    else:
+        run_import(args.file_path, args.schema)
+
 if __name__ == "__main__":
-    run_import()
\ No newline at end of file
+    main()
\ No newline at end of file
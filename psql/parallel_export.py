@@ -0,0 +1,93 @@
+"""
+Range-partitioned export of bioc_data.
+The SERIAL id range is split into one slice per worker; each worker process
+streams its slice through its own connection and server-side cursor into a
+shard file, and the shards can then be concatenated in id order.
+"""
+
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import psycopg2
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from common.output_sink import open_output  # noqa: E402
+
+
+def id_ranges(db_params, parts):
+    """Split [min(id), max(id)] of bioc_data into at most `parts` (start, end) slices."""
+    conn = psycopg2.connect(**db_params)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT min(id), max(id) FROM bioc_data")
+            low, high = cur.fetchone()
+    finally:
+        conn.close()
+    if low is None:
+        return []
+    step = -(-(high - low + 1) // parts)
+    return [(start, min(start + step, high + 1)) for start in range(low, high + 1, step)]
+
+
+def shard_path(output_file, index):
+    return f"{output_file}.part-{index:03d}"
+
+
+def _export_range(task):
+    db_params, query, start, end, shard_file, format_row = task
+    conn = psycopg2.connect(**db_params)
+    try:
+        count = 0
+        cur = conn.cursor(name=f"fetch_range_{start}")
+        cur.execute(query, {"start": start, "end": end})
+        with open(shard_file, "w", encoding="utf-8") as f:
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    line = format_row(row)
+                    if line is not None:
+                        f.write(line)
+                        count += 1
+        cur.close()
+        return count
+    finally:
+        conn.close()
+
+
+def export_parallel(db_params, range_query, output_file, format_row, workers, merge=True,
+                    compression=None):
+    """
+    Run `range_query` (with %(start)s and %(end)s id bounds) over `workers`
+    connections at once. `format_row` turns a row into an output line, or None
+    to skip it. With merge=True the shards are concatenated into `output_file`
+    in id order and removed; otherwise they are left as <output_file>.part-NNN.
+    `compression` applies to the merged file.
+    Return the number of lines written.
+    """
+    start_time = time.perf_counter()
+    ranges = id_ranges(db_params, workers)
+    tasks = [(db_params, range_query, start, end, shard_path(output_file, index), format_row)
+             for index, (start, end) in enumerate(ranges)]
+    print(f"Exporting {len(tasks)} id ranges over {len(tasks)} connections...")
+
+    total = 0
+    with multiprocessing.Pool(max(len(tasks), 1)) as pool:
+        for count in pool.imap_unordered(_export_range, tasks):
+            total += count
+            print(f"Processed {total} rows...")
+
+    if merge:
+        with open_output(output_file, compression) as out:
+            for task in tasks:
+                with open(task[4], "rb") as f:
+                    shutil.copyfileobj(f, out, 1024 * 1024)
+                os.remove(task[4])
+    print(f"Exported {total} lines in {time.perf_counter() - start_time:.2f} seconds.")
+    return total